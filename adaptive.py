@@ -0,0 +1,113 @@
+from constants import *
+from problem_bank import get_bank
+
+SMOOTHING = 0.2  # Weight of the newest answer in the moving averages
+START_ACCURACY = 0.8
+FAST_REACTION = 2000  # Milliseconds from spawn to hit that count as fast...
+SLOW_REACTION = 8000  # ...and as slow
+ANSWER_WINDOW = 0.4  # Share of an operation's answers (by size) offered at once
+SPEED_RANGE = (0.7, 1.3)  # Fall speed multiplier at skill 0 and 1
+SPAWN_RANGE = (1.3, 0.7)  # Spawn delay multiplier at skill 0 and 1
+
+
+class OperationStats:
+    # Running stats for one operation: counts plus exponentially weighted
+    # accuracy and reaction time
+    __slots__ = ("answered", "correct", "accuracy", "reaction", "skill", "min_answer", "max_answer")
+
+    def __init__(self):
+        self.answered = 0
+        self.correct = 0
+        self.accuracy = START_ACCURACY
+        self.reaction = None  # No answer yet
+        self.skill = 0.0
+        self.min_answer = None
+        self.max_answer = None
+
+    def state(self):
+        return {
+            "answered": self.answered,
+            "correct": self.correct,
+            "accuracy": self.accuracy,
+            "reaction_ms": self.reaction,
+            "skill": self.skill,
+            "answer_range": [self.min_answer, self.max_answer],
+        }
+
+
+class AdaptiveDifficulty:
+    # Steers problems towards what the player can handle. Each operation
+    # has a skill in [0, 1] from its accuracy and reaction time; it picks
+    # which slice of the operation's answers (small to large numbers) is
+    # asked. The mean skill scales fall speed and spawn delay. record() is
+    # O(1), everything else only reads precomputed values.
+    def __init__(self, level):
+        self.level = level
+        bank = get_bank()
+        self.tables = {operation: bank.tables[level][operation] for operation in bank.operations(level)}
+        self.operations = {operation: OperationStats() for operation in self.tables}
+        self.operation_names = list(self.operations)
+        self.skill_total = 0.0
+        for operation, stats in self.operations.items():
+            self.update_skill(operation, stats)
+
+    def record(self, operation, correct, reaction_ms=None):
+        # One answered (or missed, reaction_ms None) problem
+        stats = self.operations[operation]
+        stats.answered += 1
+        if correct:
+            stats.correct += 1
+        stats.accuracy += ((1.0 if correct else 0.0) - stats.accuracy) * SMOOTHING
+        if reaction_ms is not None:
+            if stats.reaction is None:
+                stats.reaction = reaction_ms
+            else:
+                stats.reaction += (reaction_ms - stats.reaction) * SMOOTHING
+        self.update_skill(operation, stats)
+
+    def update_skill(self, operation, stats):
+        if stats.reaction is None:
+            speed = 0.5
+        else:
+            speed = (SLOW_REACTION - stats.reaction) / (SLOW_REACTION - FAST_REACTION)
+            speed = max(0.0, min(1.0, speed))
+        skill = max(0.0, stats.accuracy - 0.5) * 2 * (0.5 + 0.5 * speed)
+        self.skill_total += skill - stats.skill
+        stats.skill = skill
+
+        # Move the answer window along the operation's sorted answers
+        answers = self.tables[operation].answers
+        size = max(1, int(len(answers) * ANSWER_WINDOW))
+        start = int(skill * (len(answers) - size))
+        stats.min_answer = answers[start]
+        stats.max_answer = answers[start + size - 1]
+
+    @property
+    def skill(self):
+        return self.skill_total / len(self.operations)
+
+    @property
+    def speed_scale(self):
+        low, high = SPEED_RANGE
+        return low + (high - low) * self.skill
+
+    @property
+    def spawn_scale(self):
+        low, high = SPAWN_RANGE
+        return low + (high - low) * self.skill
+
+    def choose(self, rng):
+        # (operation, min answer, max answer) for the next problem
+        operation = rng.choice(self.operation_names)
+        stats = self.operations[operation]
+        return operation, stats.min_answer, stats.max_answer
+
+    def state(self):
+        # Plain data (JSON serializable) for logging and offline analysis
+        return {
+            "level": self.level,
+            "skill": self.skill,
+            "speed_scale": self.speed_scale,
+            "spawn_scale": self.spawn_scale,
+            "operations": {operation: stats.state() for operation, stats in self.operations.items()},
+        }
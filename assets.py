@@ -0,0 +1,58 @@
+import os
+import threading
+import pygame
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Fonts by key: (name, size, bold)
+FONTS = {
+    "large": ("Arial", 40, True),
+    "medium": ("Arial", 28, False),
+    "small": ("Arial", 24, False),
+}
+
+# Sound effects by key
+SOUNDS = {
+    "correct": "mixkit-retro-game-notification-212.wav",
+    "wrong": "mixkit-arcade-retro-game-over-213.wav",
+    "level_up": "winners_W9Cpenj.mp3",
+}
+
+
+class Assets:
+    # Fonts and sounds loaded on first use and cached by key. The lock makes
+    # it safe to load from other threads: sounds are decoded ahead of time
+    # by the audio thread (audio.py).
+    def __init__(self):
+        self.fonts = {}
+        self.sounds = {}
+        self.lock = threading.Lock()
+
+    def font(self, key):
+        font = self.fonts.get(key)
+        if font is None:
+            name, size, bold = FONTS[key]
+            with self.lock:
+                font = self.fonts.get(key)
+                if font is None:
+                    font = pygame.font.SysFont(name, size, bold=bold)
+                    self.fonts[key] = font
+        return font
+
+    def sound(self, key):
+        sound = self.sounds.get(key)
+        if sound is None:
+            with self.lock:
+                sound = self.sounds.get(key)
+                if sound is None:
+                    sound = pygame.mixer.Sound(os.path.join(ASSET_DIR, SOUNDS[key]))
+                    self.sounds[key] = sound
+        return sound
+
+    def load_sounds(self):
+        for key in SOUNDS:
+            self.sound(key)
+
+
+# Shared asset cache
+assets = Assets()
@@ -0,0 +1,65 @@
+import queue
+import threading
+import time
+import pygame
+from assets import assets, SOUNDS
+
+CHANNELS_PER_SOUND = 2  # Overlapping plays of one effect
+FREE_CHANNELS = 8  # Unreserved channels left for anything else
+REPEAT_WINDOW = 0.08  # Seconds in which repeats of an effect are dropped
+STALE_AFTER = 0.25  # Seconds after which a queued request is not worth playing
+
+
+class Audio:
+    # Sound effects played off the main thread. play() only queues the
+    # request, after dropping repeats of the same effect within
+    # REPEAT_WINDOW. A worker thread decodes every sound up front and then
+    # plays the requests on mixer channels reserved per effect, so a burst
+    # of one effect cannot take the channels of the others.
+    def __init__(self):
+        self.requests = queue.SimpleQueue()
+        self.channels = {}  # key -> [channel, time started] for each reserved channel
+        self.last_played = {}  # key -> time of the last accepted request
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None or not pygame.mixer.get_init():
+            return  # Already running, or there is no audio device
+        reserved = len(SOUNDS) * CHANNELS_PER_SOUND
+        if pygame.mixer.get_num_channels() < reserved + FREE_CHANNELS:
+            pygame.mixer.set_num_channels(reserved + FREE_CHANNELS)
+        pygame.mixer.set_reserved(reserved)  # Sound.play() will not pick these
+        for i, key in enumerate(SOUNDS):
+            first = i * CHANNELS_PER_SOUND
+            self.channels[key] = [[pygame.mixer.Channel(first + j), 0.0] for j in range(CHANNELS_PER_SOUND)]
+        self.thread = threading.Thread(target=self.run, name="audio", daemon=True)
+        self.thread.start()
+
+    def play(self, key):
+        # Never blocks
+        if self.thread is None:
+            return
+        now = time.perf_counter()
+        if now - self.last_played.get(key, -REPEAT_WINDOW) < REPEAT_WINDOW:
+            return
+        self.last_played[key] = now
+        self.requests.put((key, now))
+
+    def run(self):
+        try:
+            assets.load_sounds()
+            while True:
+                key, requested = self.requests.get()
+                now = time.perf_counter()
+                if now - requested > STALE_AFTER:
+                    continue  # Queued while the sounds were still decoding
+                # A free channel, or else the one playing the oldest sound
+                slot = min(self.channels[key], key=lambda slot: (slot[0].get_busy(), slot[1]))
+                slot[0].play(assets.sound(key))
+                slot[1] = now
+        except pygame.error:
+            pass  # The mixer was shut down (pygame.quit()) while playing
+
+
+# Shared audio player
+audio = Audio()
@@ -0,0 +1,81 @@
+# Compares brute-force bullet vs asteroid checks against the spatial hash
+# broad-phase and reports where the grid starts paying off.
+#
+# Run from the repository root: python -m benchmarks.collision
+import random
+import time
+from constants import *
+from collision import SpatialHash
+from math_problems import MathProblem
+from projectiles import Bullet
+
+FRAMES = 60
+SIZES = [1, 2, 5, 10, 20, 50, 100, 200, 500]
+
+
+def make_scene(count, rng):
+    problems = [MathProblem(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT), LEVEL_ADVANCED) for _ in range(count)]
+    bullets = []
+    for _ in range(count):
+        x, y = rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT)
+        bullets.append(Bullet(x, y, x + rng.uniform(-1, 1), y - 1, 0))
+    return problems, bullets
+
+
+def brute_force(problems, bullets):
+    hits = 0
+    for _ in range(FRAMES):
+        for problem in problems:
+            problem.y += 0.5
+        for bullet in bullets:
+            for problem in problems:
+                if bullet.check_collision(problem):
+                    hits += 1
+                    break
+    return hits
+
+
+def spatial_hash(problems, bullets):
+    hits = 0
+    grid = SpatialHash()
+    for problem in problems:
+        grid.insert(problem, problem.x, problem.y, problem.radius)
+    for _ in range(FRAMES):
+        for problem in problems:
+            problem.y += 0.5
+            grid.move(problem, problem.x, problem.y, problem.radius)
+        for bullet in bullets:
+            for problem in grid.query(bullet.x, bullet.y):
+                if bullet.check_collision(problem):
+                    hits += 1
+                    break
+    return hits
+
+
+def measure(func, count):
+    problems, bullets = make_scene(count, random.Random(count))
+    start = time.perf_counter()
+    func(problems, bullets)
+    return (time.perf_counter() - start) * 1000 / FRAMES
+
+
+def main():
+    crossover = None
+    print(f"{'objects':>8} {'brute ms':>10} {'grid ms':>10}")
+    for count in SIZES:
+        brute_ms = measure(brute_force, count)
+        grid_ms = measure(spatial_hash, count)
+        print(f"{count:>8} {brute_ms:>10.3f} {grid_ms:>10.3f}")
+        # Crossover is the smallest size from which the grid always wins
+        if grid_ms >= brute_ms:
+            crossover = None
+        elif crossover is None:
+            crossover = count
+    if crossover is None:
+        print("Brute force was faster at every size")
+    else:
+        print(f"Spatial hash is faster from {crossover} asteroids x {crossover} bullets per frame")
+
+
+if __name__ == "__main__":
+    main()
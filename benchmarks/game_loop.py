@@ -0,0 +1,159 @@
+# Benchmarks Game.update and Game.draw under synthetic loads: every
+# combination of asteroid count, bullet count and difficulty level is held
+# steady (removed objects are replaced) for a number of frames, using
+# SDL's dummy video and audio drivers.
+#
+# Run from the repository root:
+#     python -m benchmarks.game_loop --output after.json --baseline before.json
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import display
+from constants import *
+from game import Game
+
+LEVEL_NAMES = {LEVEL_BASIC: "basic", LEVEL_INTERMEDIATE: "intermediate", LEVEL_ADVANCED: "advanced"}
+
+
+def parse_list(text):
+    return [int(value) for value in text.split(",")]
+
+
+def percentiles(samples):
+    cuts = statistics.quantiles(samples, n=100)
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+
+def top_up(game, asteroids, bullets):
+    # Keep the scene at a fixed number of asteroids and bullets
+    sim = game.sim
+    while len(sim.math_problems) < asteroids:
+        x = sim.rng.randint(100, SCREEN_WIDTH - 100)
+        y = sim.rng.randint(0, SCREEN_HEIGHT - 150)
+        sim.add_problem(sim.problem_pool.acquire(x, y, sim.difficulty_level, sim.rng, sim.recent_problems))
+    while len(sim.bullets) < bullets and sim.math_problems:
+        problem = sim.rng.choice(sim.math_problems)
+        sim.fire(problem, sim.rng.randrange(3))
+
+
+def setup(asteroids, bullets, level):
+    game = Game()
+    game.start_game(level)
+    game.sim.reset(level, seed=asteroids * 1000 + bullets * 10 + level)
+    game.sim.player.lives = 10 ** 9  # Never end the session
+    game.sim.spawn_delay = 10 ** 9  # Only top_up() adds asteroids
+    top_up(game, asteroids, bullets)
+    return game
+
+
+def run_scenario(asteroids, bullets, level, frames, warmup):
+    game = setup(asteroids, bullets, level)
+    for _ in range(warmup):
+        game.update(SIM_TICK_MS)
+        game.draw()
+        top_up(game, asteroids, bullets)
+
+    # Timing pass
+    update_times = []
+    draw_times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        game.update(SIM_TICK_MS)
+        middle = time.perf_counter()
+        game.draw()
+        end = time.perf_counter()
+        update_times.append((middle - start) * 1000)
+        draw_times.append((end - middle) * 1000)
+        top_up(game, asteroids, bullets)
+
+    # Allocation pass (tracemalloc slows everything down, so it is not timed)
+    allocated = []
+    blocks = []
+    tracemalloc.start()
+    for _ in range(min(frames, 100)):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        blocks_before = sys.getallocatedblocks()
+        game.update(SIM_TICK_MS)
+        game.draw()
+        _, peak = tracemalloc.get_traced_memory()
+        allocated.append(peak - before)
+        blocks.append(sys.getallocatedblocks() - blocks_before)
+        top_up(game, asteroids, bullets)
+    tracemalloc.stop()
+
+    frame_times = [u + d for u, d in zip(update_times, draw_times)]
+    return {
+        "asteroids": asteroids,
+        "bullets": bullets,
+        "level": LEVEL_NAMES[level],
+        "update_ms": percentiles(update_times),
+        "draw_ms": percentiles(draw_times),
+        "frame_ms": percentiles(frame_times),
+        "ticks_per_second": len(update_times) / (sum(update_times) / 1000),
+        "peak_bytes_per_frame": statistics.mean(allocated),
+        "net_blocks_per_frame": statistics.mean(blocks),
+    }
+
+
+def scenario_key(result):
+    return (result["asteroids"], result["bullets"], result["level"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Game.update and Game.draw")
+    parser.add_argument("--asteroids", type=parse_list, default=[5, 50, 200], help="comma-separated asteroid counts")
+    parser.add_argument("--bullets", type=parse_list, default=[0, 20, 100], help="comma-separated bullet counts")
+    parser.add_argument("--levels", type=parse_list, default=[LEVEL_BASIC, LEVEL_ADVANCED], help="comma-separated difficulty levels (0-2)")
+    parser.add_argument("--frames", type=int, default=300, help="measured frames per scenario")
+    parser.add_argument("--warmup", type=int, default=30, help="unmeasured frames per scenario")
+    parser.add_argument("--output", metavar="PATH", help="save results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against results saved by an earlier run")
+    args = parser.parse_args()
+
+    display.init()
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {scenario_key(result): result for result in json.load(f)["scenarios"]}
+
+    results = []
+    print(f"{'asteroids':>9} {'bullets':>7} {'level':>12} {'frame p50':>9} {'p95':>7} {'p99':>7} {'ticks/s':>9} {'KB/frame':>8}  vs baseline")
+    for level in args.levels:
+        for asteroids in args.asteroids:
+            for bullets in args.bullets:
+                result = run_scenario(asteroids, bullets, level, args.frames, args.warmup)
+                results.append(result)
+                frame = result["frame_ms"]
+                line = (f"{asteroids:>9} {bullets:>7} {result['level']:>12} {frame['p50']:>9.3f} {frame['p95']:>7.3f} "
+                        f"{frame['p99']:>7.3f} {result['ticks_per_second']:>9.0f} {result['peak_bytes_per_frame'] / 1024:>8.1f}")
+                old = baseline.get(scenario_key(result))
+                if old:
+                    change = (frame["p50"] / old["frame_ms"]["p50"] - 1) * 100
+                    line += f"  {change:+.1f}%"
+                print(line)
+
+    if args.output:
+        meta = {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "frames": args.frames,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with open(args.output, "w") as f:
+            json.dump({"meta": meta, "scenarios": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
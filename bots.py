@@ -0,0 +1,165 @@
+# Plays many headless sessions with scripted bots, in parallel, to tune
+# spawn rates and scoring. Every session gets its own seed; results are
+# written to a JSON lines file as they come in and summed up per policy and
+# difficulty at the end.
+#
+#     python bots.py --games 1000 --policies perfect,accuracy:0.8,human:0.9:2500:800
+#
+# Policies:
+#     perfect                          always right, answers after 500 ms
+#     accuracy:A                       right with probability A, after 500 ms
+#     human:A:MEAN:SD                  right with probability A, answers after
+#                                      a normally distributed reaction time
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from constants import *
+from simulation import Simulation
+
+TICK_MS = SIM_TICK_MS
+FAST_REACTION = 500  # Reaction time of the perfect and accuracy:A bots
+MIN_REACTION = 200
+MAX_GAME_MS = 30 * 60 * 1000  # Sessions still alive after this are stopped
+
+
+class Bot:
+    # Answers each asteroid once it has been on screen for a reaction time,
+    # picking the right option with probability accuracy. After a wrong
+    # answer it takes another reaction time to try again.
+    def __init__(self, accuracy=1.0, reaction_mean=FAST_REACTION, reaction_sd=0, rng=random):
+        self.accuracy = accuracy
+        self.reaction_mean = reaction_mean
+        self.reaction_sd = reaction_sd
+        self.rng = rng
+        self.plans = {}  # problem -> (spawn time, simulation time of the next click)
+
+    @classmethod
+    def from_spec(cls, spec, rng=random):
+        name, *values = spec.split(":")
+        values = [float(value) for value in values]
+        if name == "perfect" and not values:
+            return cls(rng=rng)
+        if name == "accuracy" and len(values) == 1:
+            return cls(values[0], rng=rng)
+        if name == "human" and len(values) == 3:
+            return cls(values[0], values[1], values[2], rng=rng)
+        raise ValueError(f"Unknown bot policy: {spec}")
+
+    def reaction(self):
+        return max(MIN_REACTION, self.rng.gauss(self.reaction_mean, self.reaction_sd))
+
+    def act(self, sim):
+        # Called before every simulation step
+        for problem in sim.math_problems:
+            if problem.exploding or problem.selected:
+                continue
+            plan = self.plans.get(problem)
+            if plan is None or plan[0] != problem.spawn_time:
+                # A new asteroid (problems are pooled, so objects come back)
+                self.plans[problem] = (problem.spawn_time, sim.time + self.reaction())
+                continue
+            if sim.time < plan[1] or problem.option_rects[0].top < 0:
+                continue
+            if self.rng.random() < self.accuracy:
+                option = problem.correct_option_index
+            else:
+                option = (problem.correct_option_index + self.rng.randrange(1, 3)) % 3
+            # Click like a player would: move under the asteroid, then click the option
+            sim.player.move_to(int(problem.x))
+            sim.handle_click(problem.option_rects[option].center)
+            self.plans[problem] = (problem.spawn_time, sim.time + self.reaction())
+
+
+def run_session(job):
+    # Runs in a worker process, returns one result row
+    seed, level, policy, adaptive, max_ms = job
+    sim = Simulation(level, seed, adaptive)
+    bot = Bot.from_spec(policy, random.Random(seed))
+    answers = 0
+    correct = 0
+    while not sim.game_over and sim.time < max_ms:
+        bot.act(sim)
+        sim.update(TICK_MS)
+        for _, _, right, _, _ in sim.answers:
+            answers += 1
+            correct += right
+    return {
+        "seed": seed,
+        "level": level,
+        "policy": policy,
+        "adaptive": adaptive,
+        "score": sim.player.score,
+        "player_level": sim.player.level,
+        "survival_ms": sim.time,
+        "game_over": sim.game_over,
+        "answers": answers,
+        "correct": correct,
+    }
+
+
+class Summary:
+    # Running totals for one (policy, level), so results do not have to be kept
+    def __init__(self):
+        self.games = 0
+        self.totals = {"score": 0.0, "player_level": 0.0, "survival_ms": 0.0}
+        self.squares = dict.fromkeys(self.totals, 0.0)
+        self.best_score = 0
+
+    def add(self, result):
+        self.games += 1
+        for key in self.totals:
+            self.totals[key] += result[key]
+            self.squares[key] += result[key] ** 2
+        self.best_score = max(self.best_score, result["score"])
+
+    def mean(self, key):
+        return self.totals[key] / self.games
+
+    def sd(self, key):
+        return math.sqrt(max(0.0, self.squares[key] / self.games - self.mean(key) ** 2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run bot sessions in parallel")
+    parser.add_argument("--games", type=int, default=100, help="sessions per policy and level")
+    parser.add_argument("--policies", default="perfect,accuracy:0.8,human:0.9:2500:800", help="comma-separated bot policies")
+    parser.add_argument("--levels", default="0,1,2", help="comma-separated difficulty levels")
+    parser.add_argument("--adaptive", action="store_true", help="play with adaptive difficulty")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first session, the others count up from it")
+    parser.add_argument("--max-minutes", type=float, default=MAX_GAME_MS / 60000, help="stop sessions that last longer (simulated time)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="worker processes (default: one per core)")
+    parser.add_argument("--output", default="bot_results.jsonl", help="results file, one JSON object per session")
+    args = parser.parse_args()
+
+    policies = args.policies.split(",")
+    for policy in policies:
+        Bot.from_spec(policy)  # Fail early on typos
+    levels = [int(level) for level in args.levels.split(",")]
+    max_ms = int(args.max_minutes * 60000)
+    combos = list(itertools.product(policies, levels))
+    jobs = ((args.seed + i, level, policy, args.adaptive, max_ms)
+            for i, (policy, level) in enumerate(itertools.islice(itertools.cycle(combos), args.games * len(combos))))
+
+    summaries = {combo: Summary() for combo in combos}
+    start = time.perf_counter()
+    with open(args.output, "w") as output, multiprocessing.Pool(args.processes) as pool:
+        for result in pool.imap_unordered(run_session, jobs, chunksize=8):
+            output.write(json.dumps(result) + "\n")
+            summaries[result["policy"], result["level"]].add(result)
+    elapsed = time.perf_counter() - start
+
+    games = args.games * len(combos)
+    print(f"{games} sessions in {elapsed:.1f} s on {args.processes} processes ({games / elapsed:.1f} sessions/s), results in {args.output}")
+    print(f"{'policy':>24} {'level':>5} {'score':>14} {'best':>6} {'player level':>12} {'survival (s)':>16}")
+    for (policy, level), summary in summaries.items():
+        print(f"{policy:>24} {level:>5} {summary.mean('score'):>7.0f} ±{summary.sd('score'):<5.0f} {summary.best_score:>6} "
+              f"{summary.mean('player_level'):>12.1f} {summary.mean('survival_ms') / 1000:>8.0f} ±{summary.sd('survival_ms') / 1000:<6.0f}")
+
+
+if __name__ == "__main__":
+    main()
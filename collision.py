@@ -0,0 +1,59 @@
+from constants import *
+
+class SpatialHash:
+    # Uniform grid broad-phase for bullet vs asteroid checks. Every object is
+    # stored in each cell its bounding circle overlaps, so a point (bullet)
+    # only has to look at the objects of a single cell. Objects are moved
+    # incrementally: nothing changes unless they cross into another cell.
+    # radius is the half width of the object's box; half_height defaults to
+    # it (a circle's bounding square).
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell_x, cell_y) -> {obj: None}, dicts keep insertion order
+        self.bounds = {}  # obj -> (min_x, min_y, max_x, max_y) cell range it occupies
+
+    def cell_range(self, x, y, radius, half_height=None):
+        size = self.cell_size
+        if half_height is None:
+            half_height = radius
+        return (int((x - radius) // size), int((y - half_height) // size),
+                int((x + radius) // size), int((y + half_height) // size))
+
+    def insert(self, obj, x, y, radius, half_height=None):
+        bounds = self.cell_range(x, y, radius, half_height)
+        self.bounds[obj] = bounds
+        min_x, min_y, max_x, max_y = bounds
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                self.cells.setdefault((cell_x, cell_y), {})[obj] = None
+
+    def move(self, obj, x, y, radius, half_height=None):
+        bounds = self.cell_range(x, y, radius, half_height)
+        if self.bounds.get(obj) == bounds:
+            return  # Still in the same cells
+        self.remove(obj)
+        self.insert(obj, x, y, radius, half_height)
+
+    def remove(self, obj):
+        bounds = self.bounds.pop(obj, None)
+        if bounds is None:
+            return
+        min_x, min_y, max_x, max_y = bounds
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                cell = self.cells[(cell_x, cell_y)]
+                del cell[obj]
+                if not cell:
+                    del self.cells[(cell_x, cell_y)]
+
+    def query(self, x, y):
+        # Objects whose cells contain the point (x, y)
+        size = self.cell_size
+        return self.cells.get((int(x // size), int(y // size)), ())
+
+    def clear(self):
+        self.cells.clear()
+        self.bounds.clear()
+
+    def __len__(self):
+        return len(self.bounds)
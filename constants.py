@@ -1,8 +1,3 @@
-import pygame
-
-# Initialize pygame
-pygame.init()
-
 # Screen dimensions
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -19,15 +14,6 @@ PURPLE = (128, 0, 128)
 BLUE = (0, 0, 255)
 ORANGE = (255, 165, 0)
 
-# Create the screen
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Math Shooter")
-
-# Font
-font_large = pygame.font.SysFont("Arial", 40, bold=True)
-font_medium = pygame.font.SysFont("Arial", 28)
-font_small = pygame.font.SysFont("Arial", 24)
-
 # Game states
 STATE_MENU = 0
 STATE_GAME = 1
@@ -36,4 +22,47 @@ STATE_GAME_OVER = 2
 # Difficulty levels
 LEVEL_BASIC = 0
 LEVEL_INTERMEDIATE = 1
-LEVEL_ADVANCED = 2 
\ No newline at end of file
+LEVEL_ADVANCED = 2
+
+# Spawn delay per difficulty level (milliseconds)
+SPAWN_DELAYS = {
+    LEVEL_BASIC: 10000,
+    LEVEL_INTERMEDIATE: 8000,
+    LEVEL_ADVANCED: 6000,
+}
+
+# Points awarded per correct answer for each difficulty level
+POINTS_PER_LEVEL = {
+    LEVEL_BASIC: 10,
+    LEVEL_INTERMEDIATE: 15,
+    LEVEL_ADVANCED: 20,
+}
+
+# Simulation events (reported by Simulation.update for sounds/effects)
+EVENT_CORRECT = 0
+EVENT_WRONG = 1
+EVENT_LEVEL_UP = 2
+EVENT_LIFE_LOST = 3
+
+# Asteroid sprite atlas
+ASTEROID_RADIUS = 40
+ASTEROID_COLOR = (150, 150, 150)
+ASTEROID_SHAPES = 8  # Number of distinct asteroid outlines
+ROTATION_STEPS = 64  # Rotation buckets cached per outline
+BULLET_ROTATION_STEPS = 72  # Rotation buckets cached for bullets (5 degrees each)
+
+# Background starfield
+STAR_COUNT = 150  # Total stars across all layers
+STAR_LAYERS = 3  # Far layers have smaller, slower stars
+STAR_PARALLAX_SPEED = 0.02  # Scroll speed of the nearest layer (pixels per millisecond, 0 = static)
+
+# Collision broad-phase
+COLLISION_CELL_SIZE = 100  # Spatial hash cell size in pixels
+
+# Simulation timing
+SIM_TICK_MS = 10  # Fixed simulation step in milliseconds
+MAX_CATCH_UP_STEPS = 5  # Simulation steps allowed per frame before dropping time
+
+# Swarm mode (needs NumPy): asteroids spawn continuously and missed ones cost no lives
+SWARM_SPAWN_DELAY = 5  # Milliseconds between asteroids
+SWARM_MAX_ASTEROIDS = 1000  # No new asteroids above this, so update and draw fit in a 60 FPS frame
@@ -0,0 +1,63 @@
+import os
+import pygame
+from pygame._sdl2.video import Window
+from constants import *
+
+# The window is only created when init() is called, so the simulation
+# modules can be imported on machines without a display. Fonts and sounds
+# are loaded on first use by assets.py.
+#
+# Everything is simulated and drawn in logical SCREEN_WIDTH x SCREEN_HEIGHT
+# coordinates. In scaled mode the window can have any size (or be
+# fullscreen): SDL keeps screen at the logical size, scales it to the
+# window on the GPU once per flip and maps mouse positions back to logical
+# coordinates. Fonts and sprites are rasterized once, at the logical size.
+#
+# Scaling only uses whole-number factors (2x, 3x, ...), nearest-neighbour,
+# with black borders around the rest of the window. Every logical pixel
+# becomes the same square of window pixels, so text stays crisp; at
+# fractional factors (1920x1080 is 1.8x) glyph strokes would come out
+# unevenly wide. pygame's SCALED windows scale this way, but its
+# fullscreen mode stretches by any factor, so fullscreen here is the
+# SCALED window switched to desktop fullscreen through SDL directly.
+screen = None
+scaled = False
+window_size = None  # Window size to go back to when leaving fullscreen
+
+
+def init(scale=False, fullscreen=False):
+    global screen, scaled
+
+    # Initialize pygame
+    pygame.init()
+
+    # Create the screen
+    flags = 0
+    if scale or fullscreen:
+        scaled = True
+        os.environ.setdefault("SDL_RENDER_SCALE_QUALITY", "nearest")
+        flags = pygame.SCALED | pygame.RESIZABLE
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags)
+    pygame.display.set_caption("Math Shooter")
+    if fullscreen:
+        toggle_fullscreen()
+
+
+def toggle_fullscreen():
+    # Switch a scaled window to fullscreen and back, keeping whole-number scaling
+    global screen, window_size
+    if not scaled:
+        return
+    window = Window.from_display_module()
+    try:
+        if window_size is None:
+            size = window.size
+            window.set_fullscreen(desktop=True)
+            window_size = size
+        else:
+            window.set_windowed()
+            window.size = window_size
+            window_size = None
+    except pygame.error as e:
+        print(f"Could not toggle fullscreen: {e}")
+    screen = pygame.display.get_surface()
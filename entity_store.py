@@ -0,0 +1,130 @@
+from constants import *
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only swarm mode needs it
+    np = None
+
+PROBLEM_FIELDS = ("x", "y", "prev_x", "prev_y", "speed", "rotation", "rotation_speed", "radius", "serial")
+BULLET_FIELDS = ("x", "y", "prev_x", "prev_y", "direction_x", "direction_y", "speed", "target")
+
+
+class EntityTable:
+    # Structure-of-arrays table: one float array per field plus an
+    # "enabled" flag. Rows are kept dense, removal moves the last row into
+    # the hole. owners[row] is the view object stored in that row, and
+    # each view keeps its current row in view.row.
+    def __init__(self, fields, capacity=256):
+        self.fields = fields
+        self.count = 0
+        self.owners = []
+        for field in fields:
+            setattr(self, field, np.zeros(capacity))
+        self.enabled = np.zeros(capacity, dtype=bool)
+
+    def capacity(self):
+        return len(self.enabled)
+
+    def grow(self):
+        capacity = self.capacity() * 2
+        for field in self.fields:
+            column = np.zeros(capacity)
+            column[:self.count] = getattr(self, field)[:self.count]
+            setattr(self, field, column)
+        enabled = np.zeros(capacity, dtype=bool)
+        enabled[:self.count] = self.enabled[:self.count]
+        self.enabled = enabled
+
+    def add(self, owner):
+        if self.count == self.capacity():
+            self.grow()
+        row = self.count
+        self.count += 1
+        self.owners.append(owner)
+        self.enabled[row] = True
+        owner.row = row
+        return row
+
+    def remove(self, row):
+        last = self.count - 1
+        if row != last:
+            for field in self.fields:
+                column = getattr(self, field)
+                column[row] = column[last]
+            self.enabled[row] = self.enabled[last]
+            moved = self.owners[last]
+            self.owners[row] = moved
+            moved.row = row
+        self.owners.pop()
+        self.count = last
+
+    def remove_rows(self, rows):
+        # Highest rows first, so a row moved into a hole is never one still waiting to be removed
+        for row in sorted(rows, reverse=True):
+            self.remove(row)
+
+    def clear(self):
+        self.count = 0
+        self.owners.clear()
+
+    def column(self, field):
+        return getattr(self, field)[:self.count]
+
+
+class EntityStore:
+    # Positions and motion of every asteroid and bullet in NumPy arrays, so
+    # movement and bullet vs asteroid tests run as a few batched operations
+    # instead of per-object Python code (see swarm.py)
+    def __init__(self, capacity=256):
+        if np is None:
+            raise RuntimeError("The entity store requires NumPy (pip install numpy)")
+        self.problems = EntityTable(PROBLEM_FIELDS, capacity)
+        self.bullets = EntityTable(BULLET_FIELDS, capacity)
+
+    def clear(self):
+        self.problems.clear()
+        self.bullets.clear()
+
+    def step(self, dt):
+        problems = self.problems
+        n = problems.count
+        problems.prev_x[:n] = problems.x[:n]
+        problems.prev_y[:n] = problems.y[:n]
+        problems.y[:n] += problems.speed[:n] * dt
+        problems.rotation[:n] += problems.rotation_speed[:n] * dt
+
+        bullets = self.bullets
+        n = bullets.count
+        bullets.prev_x[:n] = bullets.x[:n]
+        bullets.prev_y[:n] = bullets.y[:n]
+        bullets.x[:n] += bullets.direction_x[:n] * bullets.speed[:n] * dt
+        bullets.y[:n] += bullets.direction_y[:n] * bullets.speed[:n] * dt
+
+    def offscreen_problems(self):
+        return np.flatnonzero(self.problems.column("y") > SCREEN_HEIGHT)
+
+    def click_candidates(self, x, y):
+        # Rows whose option area (see MathProblem.option_area) contains (x, y)
+        rows_x = self.problems.column("x")
+        rows_y = self.problems.column("y")
+        return np.flatnonzero((np.abs(rows_x + 10 - x) <= 86) & (np.abs(rows_y + 55 - y) <= 16))
+
+    def offscreen_bullets(self):
+        x = self.bullets.column("x")
+        y = self.bullets.column("y")
+        return np.flatnonzero((x < 0) | (x > SCREEN_WIDTH) | (y < 0) | (y > SCREEN_HEIGHT))
+
+    def bullet_hits(self):
+        # Returns (bullet_rows, problem_rows) for every bullet inside its
+        # own target (the asteroid whose serial it holds), if still enabled.
+        # Bullets fly through the other asteroids of the swarm.
+        if self.bullets.count == 0 or self.problems.count == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        problems = self.problems
+        dx = self.bullets.column("x")[:, None] - problems.column("x")[None, :]
+        dy = self.bullets.column("y")[:, None] - problems.column("y")[None, :]
+        radius = problems.column("radius")
+        targets = self.bullets.column("target")[:, None] == problems.column("serial")[None, :]
+        inside = (dx * dx + dy * dy < radius * radius) & targets & problems.enabled[:problems.count]
+        bullet_rows = np.flatnonzero(inside.any(axis=1))
+        return bullet_rows, inside[bullet_rows].argmax(axis=1)
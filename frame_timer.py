@@ -0,0 +1,50 @@
+import atexit
+import time
+from constants import *
+
+PHASES = ("events", "update", "draw", "flip")
+
+
+class FrameTimer:
+    # Per-phase frame timings for the main loop. Each phase is timed with
+    # a perf_counter() start value:
+    #
+    #     start = time.perf_counter()
+    #     game.handle_events()
+    #     start = timer.add("events", start)
+    #
+    # Timings can be written to a CSV file, one row per frame, and are shown
+    # on screen by the performance HUD (perf_hud.py).
+    def __init__(self, csv_path=None):
+        self.times = dict.fromkeys(PHASES, 0.0)  # Milliseconds spent this frame
+        self.averages = dict.fromkeys(PHASES, 0.0)  # Smoothed over recent frames
+        self.ticks = 0  # Simulation steps run this frame
+        self.frame = 0
+        self.csv_file = None
+        if csv_path:
+            self.csv_file = open(csv_path, "w")
+            self.csv_file.write("frame,ticks," + ",".join(PHASES) + ",total\n")
+            atexit.register(self.close)
+
+    def begin_frame(self):
+        for phase in PHASES:
+            self.times[phase] = 0.0
+        self.ticks = 0
+
+    def add(self, phase, start):
+        now = time.perf_counter()
+        self.times[phase] += (now - start) * 1000
+        return now
+
+    def end_frame(self):
+        for phase in PHASES:
+            self.averages[phase] += (self.times[phase] - self.averages[phase]) * 0.05
+        if self.csv_file:
+            values = ",".join(f"{self.times[phase]:.3f}" for phase in PHASES)
+            self.csv_file.write(f"{self.frame},{self.ticks},{values},{sum(self.times.values()):.3f}\n")
+        self.frame += 1
+
+    def close(self):
+        if self.csv_file:
+            self.csv_file.close()
+            self.csv_file = None
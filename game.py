@@ -1,195 +1,240 @@
 import pygame
-import random
 import sys
 from pygame.locals import *
 from constants import *
-from player import Player
-from math_problems import MathProblem
-from projectiles import Bullet
+import display
+from audio import audio
+import text_cache
+from simulation import Simulation
+from starfield import Starfield
 from ui import Menu
+from hud import Hud
+from renderer import DirtyRenderer
+from replay import Recorder
+from stats import StatsWriter
+from input_events import InputBatch
 
 class Game:
-    win_sfx = pygame.mixer.Sound("mixkit-retro-game-notification-212.wav")
-    lose_sfx = pygame.mixer.Sound("mixkit-arcade-retro-game-over-213.wav")
-    #point_counter = 0 #to count the points and know what level the player is on
-    def __init__(self):
+    def __init__(self, swarm=False, dirty_rects=False, record_dir=None, stats_dir=None, adaptive=False, telemetry=None):
+        # Decode sounds in the background while the menu shows
+        audio.start()
+        self.starfield = Starfield()
+        self.swarm = swarm
+        if swarm:
+            # Imported here so NumPy is only loaded up front for swarm mode
+            from swarm import SwarmSimulation
+            from swarm_draw import SwarmDrawer
+            self.sim = SwarmSimulation(adaptive=adaptive)
+            self.swarm_drawer = SwarmDrawer()
+        else:
+            self.sim = Simulation(adaptive=adaptive)
+            self.swarm_drawer = None
+        self.particles = None  # Debris, sparks and trails, created when the first game starts
         self.reset_game()
         self.menu = Menu()
+        self.hud = Hud()
+        self.frozen_frame = None  # Game over screen, drawn once
         self.game_state = STATE_MENU
         
-    def reset_game(self):
-        self.player = Player()
-        self.math_problems = []
-        self.bullets = []
-        self.spawn_timer = 0
-        self.difficulty_level = LEVEL_BASIC  # Game difficulty level (separate from player level)
+        # Dirty-rectangle mode redraws only what changed over a static background
+        self.renderer = None
+        if dirty_rects:
+            background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            background.fill(DARK_BLUE)
+            self.starfield.draw(background, 0)
+            self.renderer = DirtyRenderer(background.convert())
+            self.drawn_state = None
+            
+        # Optionally record every session for replay.py
+        self.recorder = Recorder(record_dir) if record_dir else None
         
-        # Adjust spawn delay based on level
-        self.last_time = pygame.time.get_ticks()
-        self.game_over = False
+        # Optionally save session and per-answer stats
+        self.stats = StatsWriter(stats_dir) if stats_dir else None
         
-    def start_game(self, level):
-        self.reset_game()
-        self.difficulty_level = level
+        # Optionally stream live metrics to a collector (a TelemetrySender, see telemetry.py)
+        self.telemetry = telemetry
         
-        # Set spawn delay based on level
-        if level == LEVEL_BASIC:
-            self.spawn_delay = 10000  # 10 seconds
-        elif level == LEVEL_INTERMEDIATE:
-            self.spawn_delay = 8000   # 8 seconds
-        else:  # LEVEL_ADVANCED
-            self.spawn_delay = 6000   # 6 seconds
-            
+        # Extra key -> callback bindings (e.g. debug overlays), work in every state
+        self.key_handlers = {}
+        self.input = InputBatch()
+        
+    def reset_game(self, level=LEVEL_BASIC):
+        self.sim.reset(level)
+        if self.particles:
+            self.particles.clear()
+        
+    def start_game(self, level):
+        if self.particles is None:
+            # Imported here so NumPy does not delay the first frame of the menu
+            from particles import ParticleSystem
+            try:
+                self.particles = ParticleSystem()
+            except RuntimeError:
+                self.particles = False  # No NumPy: explosions are drawn as circles
+        self.reset_game(level)
         self.game_state = STATE_GAME
+        if self.recorder:
+            self.recorder.start(self.sim.seed, level, self.swarm, self.sim.adaptive)
+        if self.stats:
+            self.stats.start_session(self.sim.seed, level, self.swarm)
+            
+    def end_session(self):
+        # Called on game over, when going back to the menu and when quitting
+        if self.recorder:
+            self.recorder.stop()
+        if self.stats:
+            difficulty = self.sim.difficulty.state() if self.sim.difficulty else None
+            self.stats.end_session(self.sim.player, self.sim.time, difficulty)
+            
+    def quit(self):
+        self.end_session()
+        if self.stats:
+            self.stats.close()
+        if self.telemetry:
+            self.telemetry.close()
+        pygame.quit()
+        sys.exit()
         
     def handle_events(self):
         # Handle events common to all game states
-        mouse_click = False
-        for event in pygame.event.get():
-            if event.type == QUIT:
-                pygame.quit()
-                sys.exit()
-                
-            if event.type == MOUSEBUTTONDOWN and event.button == 1:
-                mouse_click = True
-                
-            if event.type == KEYDOWN:
-                if event.key == K_ESCAPE:
-                    # If in game, return to menu
-                    if self.game_state == STATE_GAME:
-                        self.game_state = STATE_MENU
-                    # If in menu, quit game
-                    elif self.game_state == STATE_MENU:
-                        pygame.quit()
-                        sys.exit()
-                # Game over - press ENTER to go back to menu
-                if (self.game_state == STATE_GAME_OVER or (self.game_state == STATE_GAME and self.game_over)) and event.key == K_RETURN:
+        batch = self.input.poll()
+        if batch.quit:
+            self.quit()
+        if batch.resized and self.renderer is not None:
+            self.renderer.invalidate()  # Scaled windows are repainted from scratch
+            
+        for key in batch.keys:
+            handler = self.key_handlers.get(key)
+            if handler:
+                handler()
+                if self.renderer is not None:
+                    self.renderer.invalidate()  # The handler may have hidden an overlay
+            if key == K_ESCAPE:
+                # If in game, return to menu
+                if self.game_state == STATE_GAME:
                     self.game_state = STATE_MENU
+                    self.end_session()
+                # If in menu, quit game
+                elif self.game_state == STATE_MENU:
+                    self.quit()
+            # Game over - press ENTER to go back to menu
+            if (self.game_state == STATE_GAME_OVER or (self.game_state == STATE_GAME and self.sim.game_over)) and key == K_RETURN:
+                self.game_state = STATE_MENU
         
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = batch.mouse_pos
         
         # Move player with mouse in game state
-        if self.game_state == STATE_GAME and not self.game_over:
-            self.player.move_to(mouse_pos[0])
+        if self.game_state == STATE_GAME and not self.sim.game_over:
+            self.sim.player.move_to(mouse_pos[0])
+            if self.recorder:
+                self.recorder.move(mouse_pos[0])
         
         # Handle state-specific events
         if self.game_state == STATE_MENU:
             # Check if Start button was clicked
-            if self.menu.handle_events([], mouse_pos, mouse_click):
+            if self.menu.handle_events(batch):
                 self.start_game(self.menu.selected_level)
                 
-        elif self.game_state == STATE_GAME and not self.game_over:
-            # Game state - handle clicking on math problem options
-            if mouse_click:
-                self.handle_game_click(mouse_pos)
-    
-    def handle_game_click(self, mouse_pos):
-        # Check if player clicked on any option
-        for problem in self.math_problems:
-            if problem.exploding or problem.selected or problem.y > SCREEN_HEIGHT:
-                continue  # Skip already answered, exploding, or off-screen problems
-                
-            for i, rect in enumerate(problem.option_rects):
-                if rect.collidepoint(mouse_pos):
-                    # Create a bullet
-                    self.bullets.append(Bullet(self.player.x, self.player.y - 25, problem.x, problem.y, i))
-                    break
+        elif self.game_state == STATE_GAME and not self.sim.game_over:
+            # Game state - every click this frame can shoot at a math problem option
+            for pos in batch.clicks:
+                self.sim.handle_click(pos)
+                if self.recorder:
+                    self.recorder.click(pos)
     
-    def update(self):
-        if self.game_state != STATE_GAME or self.game_over:
+    def update(self, dt):
+        # Advance the game by one fixed simulation step of dt milliseconds
+        if self.game_state != STATE_GAME or self.sim.game_over:
             return
             
-        current_time = pygame.time.get_ticks()
-        dt = current_time - self.last_time
-        self.last_time = current_time
-        
-        # Update player level based on score
-        level_increased = self.player.update_level()
-        
-        # If player level increased, we can add effects or adjust difficulty
-        if level_increased:
-            # Optional: Adjust difficulty as player progresses
-            # For example, reduce spawn time slightly with each level
-            self.spawn_delay = max(2000, self.spawn_delay - 300)
-        
-        # Spawn new math problems
-        self.spawn_timer += dt
-        if self.spawn_timer >= self.spawn_delay:
-            self.spawn_timer = 0
-            x = random.randint(100, SCREEN_WIDTH - 100)
-            self.math_problems.append(MathProblem(x, -50, self.difficulty_level))
-            
-        # Update math problems
-        for problem in list(self.math_problems):
-            problem.update(dt)
-            
-            # Remove problems that go off-screen or are answered correctly
-            if problem.y > SCREEN_HEIGHT or problem.selected:
-                self.math_problems.remove(problem)
-                
-                # If problem goes off-screen without being answered, lose a life
-                if not problem.selected and problem.y > SCREEN_HEIGHT:
-                    self.player.lives -= 1
-                    if self.player.lives <= 0:
-                        self.game_over = True
-        
-        # Update bullets
-        for bullet in list(self.bullets):
-            bullet.update(dt)
-            
-            # Check if bullet is off-screen
-            if bullet.y < 0 or bullet.y > SCREEN_HEIGHT or bullet.x < 0 or bullet.x > SCREEN_WIDTH:
-                self.bullets.remove(bullet)
-                continue
-                
-            # Check bullet collisions with problems
-            for problem in list(self.math_problems):
-                if problem.exploding or problem.selected:
-                    continue
-                    
-                if bullet.check_collision(problem):
-                    # Check if correct option
-                    if bullet.option_index == problem.correct_option_index:
-                        problem.start_explosion()
-                        self.win_sfx.play()
-                        # Award more points for harder levels
-                        if self.difficulty_level == LEVEL_BASIC:
-                            self.player.score += 10 #counter to track score
-                         
-                        elif self.difficulty_level == LEVEL_INTERMEDIATE:
-                            self.player.score += 15
-                         
-                        else:  # LEVEL_ADVANCED
-                            self.player.score += 20
-                            
-                    else:
-                        problem.wrong_answer_clicked = True
-                        self.lose_sfx.play()
-                        problem.wrong_time = pygame.time.get_ticks()
-                        self.player.lives -= 1
-                        if self.player.lives <= 0:
-                            self.game_over = True
-                            
-                
-
-                    # Remove bullet
-                    if bullet in self.bullets:
-                        self.bullets.remove(bullet)
-                    break
+        self.sim.update(dt)
+        if self.recorder:
+            self.recorder.tick(dt)
+        if self.stats:
+            for text, chosen, correct, reaction, _ in self.sim.answers:
+                self.stats.answer(text, chosen, correct, reaction)
+        if self.telemetry:
+            self.telemetry.record_update(self.sim)
+        self.play_sounds(self.sim.events)
+        if self.particles:
+            self.update_particles(dt)
+        self.evict_problem_text(self.sim.removed_problems)
                         
         # Check if game over, transition to appropriate state
-        if self.game_over:
+        if self.sim.game_over:
             self.game_state = STATE_GAME_OVER
+            self.frozen_frame = None
+            self.end_session()
+            
+    def play_sounds(self, events):
+        # Only queues the sounds, they are played on the audio thread
+        for event in events:
+            if event == EVENT_CORRECT:
+                audio.play("correct")
+            elif event == EVENT_WRONG:
+                audio.play("wrong")
+            elif event == EVENT_LEVEL_UP:
+                audio.play("level_up")
         
-    def draw(self):
-        screen.fill(DARK_BLUE)
+    def update_particles(self, dt):
+        particles = self.particles
+        for x, y, correct in self.sim.hits:
+            if correct:
+                particles.explode(x, y)
+            else:
+                particles.sparks(x, y)
+        bullets = self.sim.bullets
+        particles.trails([bullet.x for bullet in bullets], [bullet.y for bullet in bullets])
+        particles.step(dt)
         
-        # Draw background stars
-        for _ in range(50):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT)
-            size = random.randint(1, 3)
-            pygame.draw.circle(screen, WHITE, (x, y), size)
+    def evict_problem_text(self, removed):
+        # Drop cached text of removed asteroids unless another asteroid still shows it
+        # (SwarmDrawer keeps its text on the asteroids and never uses the cache)
+        if not removed or self.swarm_drawer:
+            return
+        live = set()
+        for problem in self.sim.math_problems:
+            live.update(problem.texts())
+        for problem in removed:
+            text_cache.cache.evict(text for text in problem.texts() if text not in live)
+        
+    def blit(self, screen, image, position):
+        rect = screen.blit(image, position)
+        if self.renderer is not None:
+            self.renderer.add(rect)
+        
+    def present(self, extra_rects=()):
+        # Show the frame: a full flip, or only the dirty rects in dirty-rectangle mode
+        if self.renderer is None:
+            pygame.display.flip()
+        else:
+            self.renderer.present(extra_rects)
+        
+    def draw(self, alpha=1.0):
+        # alpha is how far the frame is between the last two simulation ticks
+        if self.telemetry:
+            self.telemetry.record_frame()
+        screen = display.screen
+        if self.renderer is not None:
+            if self.game_state != self.drawn_state or (self.game_state == STATE_MENU and self.menu.dirty):
+                self.renderer.invalidate()
+                self.drawn_state = self.game_state
+            elif self.swarm_drawer and self.game_state == STATE_GAME:
+                # A swarm covers most of the screen, restoring and updating
+                # 1000+ rects is slower than redrawing everything
+                self.renderer.invalidate()
+            elif self.game_state != STATE_GAME and not self.renderer.full_redraw:
+                return  # The menu and game over screens only change on invalidate()
+            self.renderer.begin(screen)
+        elif self.game_state == STATE_GAME_OVER and self.frozen_frame is not None:
+            # Nothing moves under the game over overlay, reuse the first frame drawn
+            screen.blit(self.frozen_frame, (0, 0))
+            return
+        else:
+            screen.fill(DARK_BLUE)
+            
+            # Draw background stars
+            self.starfield.draw(screen, pygame.time.get_ticks())
         
         # Draw state-specific elements
         if self.game_state == STATE_MENU:
@@ -197,61 +242,36 @@ class Game:
             
         elif self.game_state == STATE_GAME or self.game_state == STATE_GAME_OVER:
             # Draw math problems (asteroids)
-            for problem in self.math_problems:
-                problem.draw(screen)
+            if self.swarm_drawer:
+                self.swarm_drawer.draw(screen, self.sim, alpha, bool(self.particles))
+            else:
+                for problem in self.sim.math_problems:
+                    if problem.exploding and self.particles:
+                        continue  # Shown as debris by the particle system
+                    problem.draw(screen, alpha)
             
             # Draw bullets
-            for bullet in self.bullets:
-                bullet.draw(screen)
+            for bullet in self.sim.bullets:
+                bullet.draw(screen, alpha)
             
-            # Draw player
-            self.player.draw(screen)
-            
-            # Draw HUD
-            score_text = font_medium.render(f"Score: {self.player.score}", True, WHITE)
-            screen.blit(score_text, (20, 20))
-
-            # Display player progression level
-            player_level_text = font_medium.render(f"Player Level: {self.player.level}", True, GREEN)
-            screen.blit(player_level_text, (20, 50))
+            # Draw debris, sparks and bullet trails
+            if self.particles:
+                rect = self.particles.draw(screen, alpha)
+                if rect and self.renderer is not None:
+                    self.renderer.add(rect.clip(screen.get_rect()))
             
-            lives_text = font_medium.render(f"Lives: {self.player.lives}", True, WHITE)
-            screen.blit(lives_text, (SCREEN_WIDTH - lives_text.get_width() - 20, 20))
+            # Draw player
+            self.sim.player.draw(screen)
             
-            # Draw level indicator
-            if self.difficulty_level == LEVEL_BASIC:
-                level_text = "BASIC"
-                level_color = BLUE
-            elif self.difficulty_level == LEVEL_INTERMEDIATE:
-                level_text = "INTERMEDIATE"
-                level_color = PURPLE
-            else:  # LEVEL_ADVANCED
-                level_text = "ADVANCED"
-                level_color = RED
-                
-            level_display = font_small.render(f"Difficulty: {level_text}", True, level_color)
-            screen.blit(level_display, (SCREEN_WIDTH // 2 - level_display.get_width() // 2, 20))
+            if self.renderer is not None and not self.renderer.full_redraw:
+                for problem in self.sim.math_problems:
+                    self.renderer.add(problem.bounds(alpha))
+                for bullet in self.sim.bullets:
+                    self.renderer.add(bullet.bounds(alpha))
+                self.renderer.add(self.sim.player.bounds())
             
-            # Instructions
-            instructions = font_small.render("Click on an option to shoot the asteroid!", True, WHITE)
-            screen.blit(instructions, (SCREEN_WIDTH // 2 - instructions.get_width() // 2, SCREEN_HEIGHT - 30))
+            # Draw HUD (and the game over overlay)
+            self.hud.draw(screen, self.sim, self.blit)
             
-            # Game over screen
-            if self.game_over:
-                overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-                overlay.fill((0, 0, 0, 180))
-                screen.blit(overlay, (0, 0))
-                
-                game_over_text = font_large.render("Game Over", True, WHITE)
-                screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, SCREEN_HEIGHT // 2 - 70))
-                
-                final_score = font_medium.render(f"Final Score: {self.player.score}", True, WHITE)
-                screen.blit(final_score, (SCREEN_WIDTH // 2 - final_score.get_width() // 2, SCREEN_HEIGHT // 2 - 10))
-                
-                level_result = font_medium.render(f"Level: {level_text}", True, level_color)
-                screen.blit(level_result, (SCREEN_WIDTH // 2 - level_result.get_width() // 2, SCREEN_HEIGHT // 2 + 30))
-                
-                restart_text = font_medium.render("Press ENTER to return to menu", True, WHITE)
-                screen.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, SCREEN_HEIGHT // 2 + 70))
-        
-        pygame.display.flip() 
\ No newline at end of file
+            if self.game_state == STATE_GAME_OVER and self.renderer is None:
+                self.frozen_frame = screen.copy()
@@ -0,0 +1,87 @@
+import pygame
+from constants import *
+from assets import assets
+from sprites import prepare
+from text_cache import render_uncached
+
+# Difficulty level -> (name, color) shown in the HUD and on the game over screen
+LEVEL_LABELS = {
+    LEVEL_BASIC: ("BASIC", BLUE),
+    LEVEL_INTERMEDIATE: ("INTERMEDIATE", PURPLE),
+    LEVEL_ADVANCED: ("ADVANCED", RED),
+}
+
+
+class ValuePanel:
+    # HUD text showing one value, rendered again only when the value changes
+    def __init__(self, font_key, color, template):
+        self.font_key = font_key
+        self.color = color
+        self.template = template
+        self.value = None
+        self.surface = None
+
+    def render(self, value):
+        if self.surface is None or value != self.value:
+            self.value = value
+            self.surface = render_uncached(assets.font(self.font_key), self.template.format(value), self.color)
+        return self.surface
+
+
+class Hud:
+    # In-game HUD and game over screen. The labels that only depend on the
+    # difficulty are built when it changes, the value panels when their
+    # value changes, and the translucent game over overlay (with its text
+    # already on it) once per game over, so a frame only blits.
+    def __init__(self):
+        self.score = ValuePanel("medium", WHITE, "Score: {}")
+        self.player_level = ValuePanel("medium", GREEN, "Player Level: {}")
+        self.lives = ValuePanel("medium", WHITE, "Lives: {}")
+        self.level = None
+        self.labels = []  # (surface, position) for the current difficulty
+        self.overlay = None
+        self.overlay_key = None  # (score, difficulty) the overlay shows
+
+    def build_labels(self, level):
+        name, color = LEVEL_LABELS[level]
+        difficulty = render_uncached(assets.font("small"), f"Difficulty: {name}", color)
+        instructions = render_uncached(assets.font("small"), "Click on an option to shoot the asteroid!", WHITE)
+        return [
+            (difficulty, (SCREEN_WIDTH // 2 - difficulty.get_width() // 2, 20)),
+            (instructions, (SCREEN_WIDTH // 2 - instructions.get_width() // 2, SCREEN_HEIGHT - 30)),
+        ]
+
+    def build_overlay(self, score, level):
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 180))
+        name, color = LEVEL_LABELS[level]
+        lines = [
+            (render_uncached(assets.font("large"), "Game Over", WHITE), -70),
+            (render_uncached(assets.font("medium"), f"Final Score: {score}", WHITE), -10),
+            (render_uncached(assets.font("medium"), f"Level: {name}", color), 30),
+            (render_uncached(assets.font("medium"), "Press ENTER to return to menu", WHITE), 70),
+        ]
+        for text, offset in lines:
+            overlay.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 + offset))
+        return prepare(overlay)
+
+    def draw(self, surface, sim, blit):
+        # blit(surface, image, position) lets Game track dirty rects
+        if sim.difficulty_level != self.level:
+            self.level = sim.difficulty_level
+            self.labels = self.build_labels(self.level)
+
+        player = sim.player
+        blit(surface, self.score.render(player.score), (20, 20))
+        blit(surface, self.player_level.render(player.level), (20, 50))
+        lives = self.lives.render(player.lives)
+        blit(surface, lives, (SCREEN_WIDTH - lives.get_width() - 20, 20))
+        for image, position in self.labels:
+            blit(surface, image, position)
+
+        if sim.game_over:
+            key = (player.score, sim.difficulty_level)
+            if key != self.overlay_key:
+                self.overlay = self.build_overlay(*key)
+                self.overlay_key = key
+            blit(surface, self.overlay, (0, 0))
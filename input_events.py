@@ -0,0 +1,30 @@
+import pygame
+from pygame.locals import *
+
+class InputBatch:
+    # Everything the player did since the last frame. pygame's queue is
+    # drained once per frame into typed lists, so every click is kept (not
+    # just "was there a click") with the position it was made at.
+    def __init__(self):
+        self.quit = False
+        self.clicks = []  # Left click positions, oldest first
+        self.keys = []  # KEYDOWN key codes, oldest first
+        self.resized = False  # The window changed size or has to be repainted
+        self.mouse_pos = (0, 0)
+
+    def poll(self):
+        self.quit = False
+        self.clicks.clear()
+        self.keys.clear()
+        self.resized = False
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                self.quit = True
+            elif event.type == MOUSEBUTTONDOWN and event.button == 1:
+                self.clicks.append(event.pos)
+            elif event.type == KEYDOWN:
+                self.keys.append(event.key)
+            elif event.type in (VIDEORESIZE, WINDOWSIZECHANGED, WINDOWEXPOSED):
+                self.resized = True
+        self.mouse_pos = pygame.mouse.get_pos()
+        return self
@@ -1,23 +1,96 @@
+import time
+
+START_TIME = time.perf_counter()  # For the time-to-first-frame report
+
 import pygame
 import sys
+import argparse
+import importlib.util
+from pygame.locals import *
+import display
+from constants import *
 from game import Game
+from frame_timer import FrameTimer
+from perf_hud import PerfHud, FrameProfiler
+from telemetry import TelemetrySender
+from stats import STATS_DIR
 
 def main():
-    # Initialize pygame
-    pygame.init()
-    
+    parser = argparse.ArgumentParser(description="Math Shooter")
+    parser.add_argument("--timings", action="store_true", help="show the performance HUD from the start (toggle with F3)")
+    parser.add_argument("--timings-csv", metavar="PATH", help="write per-phase frame timings to a CSV file")
+    parser.add_argument("--dirty-rects", action="store_true", help="only redraw changed areas of the screen (for slow machines)")
+    parser.add_argument("--record", metavar="DIR", help="record every session into DIR for replay.py")
+    parser.add_argument("--stats", metavar="DIR", default=STATS_DIR, help="save session stats into DIR for stats.py (default: stats next to the game)")
+    parser.add_argument("--no-stats", action="store_true", help="do not save session stats")
+    parser.add_argument("--profile", type=int, metavar="FRAMES", help="profile the first FRAMES frames with cProfile into profiles/ (F4 profiles again)")
+    parser.add_argument("--adaptive", action="store_true", help="adapt problems, fall speed and spawn rate to how well you play")
+    parser.add_argument("--scaled", action="store_true", help="resizable window, the 800x600 game is scaled up by whole-number factors to fit it")
+    parser.add_argument("--fullscreen", action="store_true", help="fullscreen, scaled like --scaled with black borders around it (F11 toggles)")
+    parser.add_argument("--telemetry", metavar="ADDRESS", help="send live metrics to a collector at udp://HOST:PORT or unix:PATH (see telemetry.py)")
+    parser.add_argument("--swarm", action="store_true", help="swarm mode with up to 1000 asteroids (needs NumPy)")
+    args = parser.parse_args()
+    if args.swarm and importlib.util.find_spec("numpy") is None:
+        parser.error("--swarm requires NumPy (pip install numpy)")
+    telemetry = None
+    if args.telemetry:
+        try:
+            telemetry = TelemetrySender(args.telemetry)
+        except (ValueError, OSError) as e:
+            parser.error(f"--telemetry: {e}")
+
+    # Initialize pygame and open the window
+    display.init(args.scaled, args.fullscreen)
+
     # Create clock for controlling frame rate
     clock = pygame.time.Clock()
-    
+    timer = FrameTimer(args.timings_csv)
+    hud = PerfHud(timer, args.timings)
+
     # Create game instance
-    game = Game()
-    
-    # Main game loop
+    game = Game(args.swarm, args.dirty_rects, args.record, None if args.no_stats else args.stats, args.adaptive, telemetry)
+    game.key_handlers[K_F3] = hud.toggle
+    game.key_handlers[K_F11] = display.toggle_fullscreen
+    profiler = None
+    if args.profile:
+        profiler = FrameProfiler(args.profile)
+        game.key_handlers[K_F4] = profiler.start
+        profiler.start()
+
+    # Main game loop: the simulation runs in fixed SIM_TICK_MS steps and
+    # rendering interpolates between the last two steps
+    accumulator = 0
     while True:
+        frame_ms = clock.tick(60)  # 60 FPS
+        accumulator += frame_ms
+        timer.begin_frame()
+
+        start = time.perf_counter()
         game.handle_events()
-        game.update()
-        game.draw()
-        clock.tick(60)  # 60 FPS
+        start = timer.add("events", start)
+
+        steps = 0
+        while accumulator >= SIM_TICK_MS and steps < MAX_CATCH_UP_STEPS:
+            game.update(SIM_TICK_MS)
+            accumulator -= SIM_TICK_MS
+            steps += 1
+        if steps == MAX_CATCH_UP_STEPS:
+            accumulator = 0  # Drop the time we could not catch up on after a hitch
+        timer.ticks = steps
+        start = timer.add("update", start)
+
+        game.draw(accumulator / SIM_TICK_MS)
+        overlay_rects = hud.draw(display.screen, game.sim)
+        start = timer.add("draw", start)
+
+        game.present(overlay_rects)
+        timer.add("flip", start)
+        if timer.frame == 0:
+            print(f"Time to first frame: {(time.perf_counter() - START_TIME) * 1000:.0f} ms", flush=True)
+        timer.end_frame()
+        hud.end_frame(frame_ms)
+        if profiler:
+            profiler.end_frame()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
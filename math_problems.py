@@ -1,202 +1,179 @@
 import pygame
 import random
-import math
 from constants import *
+from assets import assets
+from text_cache import render_text
+from sprites import asteroid_atlas
+from problem_bank import get_bank
 
 class MathProblem:
-    def __init__(self, x, y, level):
+    # Problems are pooled and reset in place (see Pool), so attributes are
+    # fixed with __slots__ and the option rects are mutated, not replaced
+    __slots__ = (
+        "level", "problem", "answer", "operation", "x", "y", "prev_x", "prev_y", "speed",
+        "selected", "correct_option_index", "options", "option_texts",
+        "width", "height", "option_rects", "wrong_answer_clicked", "wrong_time",
+        "radius", "rotation", "rotation_speed", "shape",
+        "exploding", "explosion_radius", "explosion_duration", "explosion_time",
+        "spawn_time",
+    )
+    
+    def __init__(self, x, y, level, rng=random, recent=None, difficulty=None):
+        self.option_rects = [pygame.Rect(0, 0, 50, 30) for _ in range(3)]
+        self.reset(x, y, level, rng, recent, difficulty)
+        
+    def reset(self, x, y, level, rng=random, recent=None, difficulty=None):
+        # rng and recent (recently shown problems) come from the session so
+        # a seeded session always produces the same problems. difficulty is
+        # the session's AdaptiveDifficulty, if it has one.
         self.level = level
-        self.generate_problem()
+        self.generate_problem(rng, recent, difficulty)
         self.x = x
         self.y = y
+        self.prev_x = x  # Position before the last update, for interpolated drawing
+        self.prev_y = y
         
         # Adjust speed based on level
         if level == LEVEL_BASIC:
-            self.speed = random.uniform(0.02, 0.06)
+            self.speed = rng.uniform(0.02, 0.06)
         elif level == LEVEL_INTERMEDIATE:
-            self.speed = random.uniform(0.03, 0.08)
+            self.speed = rng.uniform(0.03, 0.08)
         else:  # LEVEL_ADVANCED
-            self.speed = random.uniform(0.04, 0.1)
+            self.speed = rng.uniform(0.04, 0.1)
+        if difficulty is not None:
+            self.speed *= difficulty.speed_scale
             
         self.selected = False
-        self.correct_option_index = random.randint(0, 2)
-        self.options = self.generate_options()
+        self.correct_option_index = rng.randint(0, 2)
+        self.options = self.generate_options(rng)
+        self.option_texts = [str(option) for option in self.options]
         self.width = 80
         self.height = 80
-        self.option_rects = []
         self.update_option_rects()
         self.wrong_answer_clicked = False
         self.wrong_time = 0
+        self.spawn_time = 0  # Simulation time the problem appeared, set by the Simulation
         
         # Asteroid visual properties
-        self.radius = 40
-        self.rotation = random.uniform(0, 360)
-        self.rotation_speed = random.uniform(-0.05, 0.05)
-        self.points = []
-        # Generate irregular asteroid shape
-        for i in range(8):
-            angle = i * 45 + random.uniform(-10, 10)
-            distance = self.radius + random.uniform(-10, 10)
-            x_offset = math.cos(math.radians(angle)) * distance
-            y_offset = math.sin(math.radians(angle)) * distance
-            self.points.append((x_offset, y_offset))
+        self.radius = ASTEROID_RADIUS
+        self.rotation = rng.uniform(0, 360)
+        self.rotation_speed = rng.uniform(-0.05, 0.05)
+        self.shape = rng.randrange(ASTEROID_SHAPES)  # Outline in the shared sprite atlas
             
         # Explosion animation
         self.exploding = False
         self.explosion_radius = 0
         self.explosion_duration = 500  # in milliseconds
-        self.explosion_start_time = 0
+        self.explosion_time = 0  # Time since the explosion started
         
-    def generate_problem(self):
-        if self.level == LEVEL_BASIC:
-            # Basic: Simple addition and subtraction with small numbers
-            operation = random.choice(['+', '-'])
-            
-            if operation == '+':
-                a = random.randint(1, 20)
-                b = random.randint(1, 20)
-                self.problem = f"{a} + {b}"
-                self.answer = a + b
-                
-            else:  # subtraction
-                a = random.randint(5, 20)
-                b = random.randint(1, a)  # Ensure positive result
-                self.problem = f"{a} - {b}"
-                self.answer = a - b
-                
-        elif self.level == LEVEL_INTERMEDIATE:
-            # Intermediate: All operations with medium-sized numbers
-            operation = random.choice(['+', '-', '*'])
-            
-            if operation == '+':
-                a = random.randint(10, 50)
-                b = random.randint(10, 50)
-                self.problem = f"{a} + {b}"
-                self.answer = a + b
-                
-            elif operation == '-':
-                a = random.randint(15, 50)
-                b = random.randint(5, a)
-                self.problem = f"{a} - {b}"
-                self.answer = a - b
-                
-            else:  # multiplication
-                a = random.randint(2, 12)
-                b = random.randint(2, 12)
-                self.problem = f"{a} × {b}"
-                self.answer = a * b
-                
-        else:  # LEVEL_ADVANCED
-            # Advanced: All operations including division, larger numbers
-            operation = random.choice(['+', '-', '*', '/'])
-            
-            if operation == '+':
-                a = random.randint(20, 99)
-                b = random.randint(20, 99)
-                self.problem = f"{a} + {b}"
-                self.answer = a + b
-                
-            elif operation == '-':
-                a = random.randint(30, 99)
-                b = random.randint(10, a)
-                self.problem = f"{a} - {b}"
-                self.answer = a - b
-                
-            elif operation == '*':
-                a = random.randint(5, 20)
-                b = random.randint(5, 12)
-                self.problem = f"{a} × {b}"
-                self.answer = a * b
-                
-            else:  # division - ensure it divides evenly
-                b = random.randint(2, 12)
-                result = random.randint(1, 10)
-                a = b * result
-                self.problem = f"{a} ÷ {b}"
-                self.answer = result
+    def generate_problem(self, rng=random, recent=None, difficulty=None):
+        # Pick a precomputed problem for this level from the shared bank
+        if difficulty is None:
+            self.problem, self.answer, self.operation = get_bank().sample(self.level, rng=rng, recent=recent)
+        else:
+            operation, min_answer, max_answer = difficulty.choose(rng)
+            self.problem, self.answer, self.operation = get_bank().sample(
+                self.level, operation, min_answer, max_answer, rng, recent)
     
-    def generate_options(self):
+    def generate_options(self, rng=random):
         options = [0, 0, 0]
         options[self.correct_option_index] = self.answer
         
-        # Generate wrong answers that are close to the correct one
+        # Wrong answers close to the correct one, picked from the bank's
+        # precomputed candidates for this answer
+        wrong_answers = get_bank().wrong_answers(self.answer, rng=rng)
         for i in range(3):
             if i != self.correct_option_index:
-                # Generate a wrong answer within ±10 of the correct answer, but not equal
-                wrong_answer = self.answer
-                while wrong_answer == self.answer or wrong_answer in options:
-                    # Make offset larger for larger answers
-                    max_offset = max(5, int(self.answer * 0.2))
-                    offset = random.randint(1, max_offset) * random.choice([-1, 1])
-                    wrong_answer = max(1, self.answer + offset)  # Ensure positive
-                options[i] = wrong_answer
+                options[i] = wrong_answers.pop()
                 
         return options
     
     def update_option_rects(self):
-        self.option_rects = []
-        for i in range(3):
-            rect = pygame.Rect(
-                self.x - 75 + (i * 60), 
-                self.y + 40,
-                50, 
-                30
-            )
-            self.option_rects.append(rect)
+        self.place_option_rects(self.option_rects)
+    
+    def place_option_rects(self, rects):
+        for i, rect in enumerate(rects):
+            rect.x = int(self.x - 75 + (i * 60))
+            rect.y = int(self.y + 40)
+
+    def option_area(self):
+        # (center x, center y, half width, half height) of a box around the
+        # three option rects, a pixel wider for the int() rounding above
+        return self.x + 10, self.y + 55, 86, 16
     
     def update(self, dt):
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.y += self.speed * dt
         self.update_option_rects()
         
         # Rotate asteroid
         self.rotation += self.rotation_speed * dt
         
-        # Update explosion animation
         if self.exploding:
-            current_time = pygame.time.get_ticks()
-            progress = (current_time - self.explosion_start_time) / self.explosion_duration
-            if progress >= 1:
-                self.selected = True  # Mark for removal
-            else:
-                self.explosion_radius = self.radius * progress * 2
+            self.update_explosion(dt)
     
-    def draw(self, surface):
+    def update_explosion(self, dt):
+        # Update explosion animation
+        self.explosion_time += dt
+        progress = self.explosion_time / self.explosion_duration
+        if progress >= 1:
+            self.selected = True  # Mark for removal
+        else:
+            self.explosion_radius = self.radius * progress * 2
+    
+    def draw(self, surface, alpha=1.0):
+        # Interpolate between the last two simulation ticks
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        
         if self.exploding:
             # Draw explosion
-            pygame.draw.circle(surface, ORANGE, (int(self.x), int(self.y)), int(self.explosion_radius))
-            pygame.draw.circle(surface, YELLOW, (int(self.x), int(self.y)), int(self.explosion_radius * 0.7))
+            pygame.draw.circle(surface, ORANGE, (int(x), int(y)), int(self.explosion_radius))
+            pygame.draw.circle(surface, YELLOW, (int(x), int(y)), int(self.explosion_radius * 0.7))
             return
         
         # Draw asteroid
-        points = []
-        for x_offset, y_offset in self.points:
-            rotated_x = x_offset * math.cos(math.radians(self.rotation)) - y_offset * math.sin(math.radians(self.rotation))
-            rotated_y = x_offset * math.sin(math.radians(self.rotation)) + y_offset * math.cos(math.radians(self.rotation))
-            points.append((self.x + rotated_x, self.y + rotated_y))
-            
-        pygame.draw.polygon(surface, (150, 150, 150), points)
+        asteroid_atlas.draw(surface, self.shape, self.rotation, x, y)
         
         # Draw problem text on asteroid
-        problem_text = font_small.render(self.problem, True, WHITE)
-        surface.blit(problem_text, (self.x - problem_text.get_width() // 2, self.y - problem_text.get_height() // 2))
+        problem_text = render_text(assets.font("small"), self.problem, WHITE)
+        surface.blit(problem_text, (x - problem_text.get_width() // 2, y - problem_text.get_height() // 2))
         
-        # Draw options below asteroid
+        # Draw options below asteroid, shifted to the interpolated position
+        # (a tuple, the option Rects are only mutated in update_option_rects)
+        option_rects = self.option_rects
+        dx = int(x - self.x)
+        dy = int(y - self.y)
         for i, option in enumerate(self.options):
             color = YELLOW
             if self.wrong_answer_clicked and i != self.correct_option_index:
                 color = RED
                 
-            pygame.draw.rect(surface, color, self.option_rects[i], 0, 5)
-            option_text = font_small.render(str(option), True, BLACK)
-            text_x = self.option_rects[i].x + (self.option_rects[i].width - option_text.get_width()) // 2
-            text_y = self.option_rects[i].y + (self.option_rects[i].height - option_text.get_height()) // 2
+            left, top, width, height = option_rects[i]
+            left += dx
+            top += dy
+            pygame.draw.rect(surface, color, (left, top, width, height), 0, 5)
+            option_text = render_text(assets.font("small"), self.option_texts[i], BLACK)
+            text_x = left + (width - option_text.get_width()) // 2
+            text_y = top + (height - option_text.get_height()) // 2
             surface.blit(option_text, (text_x, text_y))
         
         # Show "Wrong" text if a wrong answer was clicked
         if self.wrong_answer_clicked:
-            wrong_text = font_medium.render("Wrong!", True, RED)
-            surface.blit(wrong_text, (self.x - wrong_text.get_width() // 2, self.y - 30))
+            wrong_text = render_text(assets.font("medium"), "Wrong!", RED)
+            surface.blit(wrong_text, (x - wrong_text.get_width() // 2, y - 30))
+    
+    def bounds(self, alpha=1.0):
+        # Area draw() may touch: asteroid, explosion, options and "Wrong!" text
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        return pygame.Rect(int(x) - 95, int(y) - 85, 190, 170)
+    
+    def texts(self):
+        # Strings drawn for this problem (used to evict cached text surfaces)
+        return [self.problem] + self.option_texts
     
     def start_explosion(self):
         self.exploding = True
-        self.explosion_start_time = pygame.time.get_ticks() 
\ No newline at end of file
+        self.explosion_time = 0 
\ No newline at end of file
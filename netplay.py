@@ -0,0 +1,663 @@
+# LAN multiplayer: several players shoot at the same wave of asteroids.
+#
+# The server owns the only Simulation. Clients send the same move and click
+# records replay.py stores, and the server broadcasts one binary snapshot
+# per tick. Snapshots are deltas against the previous one (removed,
+# created and changed entities, and only the changed fields of those), so
+# one encoded snapshot goes to every client. Clients draw the last two
+# snapshots interpolated, like the local game draws its last two ticks.
+#
+#     python netplay.py server [--port 5050] [--level 1] [--tick-hz 30]
+#     python netplay.py client HOST [--port 5050]
+#     python netplay.py loadtest [--clients 40] [--seconds 10]
+import argparse
+import asyncio
+import random
+import socket
+import statistics
+import struct
+import time
+import pygame
+from constants import *
+from simulation import Simulation
+from math_problems import MathProblem
+from projectiles import Bullet
+from replay import RECORDS, RECORD_MOVE, RECORD_CLICK
+
+DEFAULT_PORT = 5050
+MAX_PLAYERS = 64
+ROUND_RESTART_MS = 5000  # Pause between game over and the next round
+MAX_BUFFERED = 256 * 1024  # Clients further behind than this are dropped
+
+# Server -> client messages, each prefixed with its length
+FRAME = struct.Struct("<I")
+MSG_WELCOME = 0
+MSG_SNAPSHOT = 1
+WELCOME = struct.Struct("<BBBB")  # type, player id, level, tick rate
+SNAPSHOT = struct.Struct("<BIbB")  # type, tick, lives, game over
+COUNT = struct.Struct("<H")
+KEY = struct.Struct("<BH")  # kind, id
+MASK = struct.Struct("<B")
+
+# Entity kinds and their per-tick fields. Positions are in quarter pixels.
+KIND_PROBLEM = 0  # x, y, rotation (1/256 turns), flags, explosion radius
+KIND_BULLET = 1  # x, y
+KIND_PLAYER = 2  # ship x, score
+FIELDS = {KIND_PROBLEM: "hhBBB", KIND_BULLET: "hh", KIND_PLAYER: "hi"}
+FIELD_STRUCTS = {kind: struct.Struct("<" + fields) for kind, fields in FIELDS.items()}
+FIELD_PACKERS = {kind: [struct.Struct("<" + field) for field in fields] for kind, fields in FIELDS.items()}
+
+# Data that does not change, sent when an entity is created
+PROBLEM_EXTRAS = struct.Struct("<Bhhh")  # shape, options (then text length and text)
+BULLET_EXTRAS = struct.Struct("<B")  # angle (1/256 turns)
+TEXT_LENGTH = struct.Struct("<B")
+
+FLAG_EXPLODING = 1
+FLAG_WRONG = 2  # Bits 2-3 then hold the correct option, to draw the others red
+
+
+def quarter(value):
+    return max(-32768, min(32767, int(value * 4)))
+
+
+def turns(degrees):
+    return int(degrees % 360 * 256 / 360) & 255
+
+
+class SharedSimulation(Simulation):
+    # One wave of asteroids for several players. Each player has a ship and
+    # a score, lives are shared. Every spawned problem and bullet gets a
+    # serial number, which the server uses as its network id.
+    def __init__(self, level=LEVEL_BASIC, seed=None):
+        self.next_serial = 0  # Not reset between rounds, so ids stay unique
+        self.ships = {}  # player id -> ship x
+        self.scores = {}  # player id -> score
+        super().__init__(level, seed)
+
+    def reset(self, level=LEVEL_BASIC, seed=None):
+        super().reset(level, seed)
+        self.serials = {}  # problem or bullet -> serial
+        self.owners = {}  # bullet -> player id
+        self.shooter = None
+        for player_id in self.scores:
+            self.scores[player_id] = 0
+
+    def add_player(self, player_id):
+        self.ships[player_id] = SCREEN_WIDTH // 2
+        self.scores[player_id] = 0
+
+    def remove_player(self, player_id):
+        del self.ships[player_id]
+        del self.scores[player_id]
+
+    def assign_serial(self, thing):
+        self.serials[thing] = self.next_serial
+        self.next_serial = (self.next_serial + 1) & 0xFFFF
+
+    def add_problem(self, problem):
+        self.assign_serial(problem)
+        super().add_problem(problem)
+
+    def add_bullet(self, bullet):
+        self.assign_serial(bullet)
+        super().add_bullet(bullet)
+
+    def move_player(self, player_id, x):
+        self.ships[player_id] = max(25, min(SCREEN_WIDTH - 25, x))
+
+    def player_click(self, player_id, pos):
+        self.shooter = player_id
+        self.handle_click(pos)
+        self.shooter = None
+
+    def fire(self, problem, option_index):
+        # Shoot from the clicking player's ship
+        bullet = self.bullet_pool.acquire(self.ships[self.shooter], self.player.y - 25, problem.x, problem.y, option_index)
+        self.owners[bullet] = self.shooter
+        self.add_bullet(bullet)
+
+    def resolve_hit(self, bullet, problem):
+        score = self.player.score  # Team score, drives the player level and spawn rate
+        super().resolve_hit(bullet, problem)
+        owner = self.owners.pop(bullet, None)
+        if owner in self.scores:
+            self.scores[owner] += self.player.score - score
+
+
+def capture(sim, extras):
+    # Snapshot state: (kind, id) -> fields. Static data for entities seen
+    # for the first time is added to extras.
+    state = {}
+    for problem in sim.math_problems:
+        key = (KIND_PROBLEM, sim.serials[problem])
+        flags = 0
+        if problem.exploding:
+            flags |= FLAG_EXPLODING
+        if problem.wrong_answer_clicked:
+            flags |= FLAG_WRONG | problem.correct_option_index << 2
+        state[key] = (quarter(problem.x), quarter(problem.y), turns(problem.rotation), flags, int(problem.explosion_radius))
+        if key not in extras:
+            text = problem.problem.encode()
+            extras[key] = PROBLEM_EXTRAS.pack(problem.shape, *problem.options) + TEXT_LENGTH.pack(len(text)) + text
+    for bullet in sim.bullets:
+        key = (KIND_BULLET, sim.serials[bullet])
+        state[key] = (quarter(bullet.x), quarter(bullet.y))
+        if key not in extras:
+            extras[key] = BULLET_EXTRAS.pack(turns(bullet.angle))
+    for player_id, x in sim.ships.items():
+        state[KIND_PLAYER, player_id] = (x, sim.scores[player_id])
+    return state
+
+
+def encode_snapshot(tick, lives, game_over, old, new, extras):
+    parts = [SNAPSHOT.pack(MSG_SNAPSHOT, tick, max(0, lives), game_over)]
+
+    removed = [key for key in old if key not in new]
+    parts.append(COUNT.pack(len(removed)))
+    parts.extend(KEY.pack(*key) for key in removed)
+
+    created = [key for key in new if key not in old]
+    parts.append(COUNT.pack(len(created)))
+    for key in created:
+        parts.append(KEY.pack(*key))
+        parts.append(FIELD_STRUCTS[key[0]].pack(*new[key]))
+        parts.append(extras.get(key, b""))
+
+    changed = []
+    for key, fields in new.items():
+        previous = old.get(key)
+        if previous is None or previous == fields:
+            continue
+        mask = 0
+        values = []
+        packers = FIELD_PACKERS[key[0]]
+        for i, value in enumerate(fields):
+            if value != previous[i]:
+                mask |= 1 << i
+                values.append(packers[i].pack(value))
+        changed.append(KEY.pack(*key) + MASK.pack(mask) + b"".join(values))
+    parts.append(COUNT.pack(len(changed)))
+    parts.extend(changed)
+    return b"".join(parts)
+
+
+def decode_extras(kind, data, offset):
+    if kind == KIND_PROBLEM:
+        shape, *options = PROBLEM_EXTRAS.unpack_from(data, offset)
+        offset += PROBLEM_EXTRAS.size
+        length = data[offset]
+        offset += 1
+        text = data[offset:offset + length].decode()
+        return (shape, options, text), offset + length
+    if kind == KIND_BULLET:
+        return data[offset] * 360 / 256, offset + 1
+    return None, offset
+
+
+def decode_snapshot(data):
+    # Returns (tick, lives, game over, removed keys, created [(key, fields,
+    # extras)], changed [(key, {field index: value})])
+    _, tick, lives, game_over = SNAPSHOT.unpack_from(data)
+    offset = SNAPSHOT.size
+
+    removed = []
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    for _ in range(count):
+        removed.append(KEY.unpack_from(data, offset))
+        offset += KEY.size
+
+    created = []
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    for _ in range(count):
+        key = KEY.unpack_from(data, offset)
+        offset += KEY.size
+        fields = FIELD_STRUCTS[key[0]].unpack_from(data, offset)
+        offset += FIELD_STRUCTS[key[0]].size
+        extras, offset = decode_extras(key[0], data, offset)
+        created.append((key, fields, extras))
+
+    changed = []
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    for _ in range(count):
+        key = KEY.unpack_from(data, offset)
+        offset += KEY.size
+        mask = data[offset]
+        offset += 1
+        values = {}
+        for i, packer in enumerate(FIELD_PACKERS[key[0]]):
+            if mask & 1 << i:
+                (values[i],) = packer.unpack_from(data, offset)
+                offset += packer.size
+        changed.append((key, values))
+    return tick, lives, bool(game_over), removed, created, changed
+
+
+def apply_snapshot(state, data):
+    # Mirror a server's state dict from its snapshots (the load test uses
+    # this to check that clients end up with exactly the server state)
+    tick, lives, game_over, removed, created, changed = decode_snapshot(data)
+    for key in removed:
+        del state[key]
+    for key, fields, _ in created:
+        state[key] = fields
+    for key, values in changed:
+        fields = list(state[key])
+        for i, value in values.items():
+            fields[i] = value
+        state[key] = tuple(fields)
+    return tick, lives, game_over
+
+
+class GameServer:
+    # Authoritative asyncio server. Intents received between ticks are
+    # applied at the start of the next tick, then the simulation advances
+    # in SIM_TICK_MS steps and one snapshot is broadcast to every client.
+    def __init__(self, level=LEVEL_BASIC, seed=None, tick_hz=30):
+        self.level = level
+        self.tick_hz = tick_hz
+        self.sim = SharedSimulation(level, seed)
+        self.clients = {}  # player id -> StreamWriter
+        self.intents = []  # (player id, writer of the connection that sent it, record)
+        self.state = {}  # As last broadcast
+        self.extras = {}
+        self.tick = 0
+        self.accumulator = 0
+        self.restart_timer = 0
+        self.step_times = []  # Milliseconds per tick, for the load test
+        self.snapshot_sizes = []
+
+    async def serve(self, host="0.0.0.0", port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        async with server:
+            await self.run_ticks()
+
+    async def run_ticks(self):
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_hz
+        next_tick = loop.time()
+        while True:
+            start = time.perf_counter()
+            self.step(interval * 1000)
+            self.step_times.append((time.perf_counter() - start) * 1000)
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                next_tick = loop.time()  # Fell behind, do not try to catch up
+            await asyncio.sleep(max(0, delay))
+
+    async def handle_client(self, reader, writer):
+        free = [player_id for player_id in range(1, MAX_PLAYERS + 1) if player_id not in self.clients]
+        if not free:
+            writer.close()
+            return
+        player_id = free[0]
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Welcome and the full last broadcast state, the next delta applies on top of it
+        self.send(writer, WELCOME.pack(MSG_WELCOME, player_id, self.level, self.tick_hz))
+        self.send(writer, encode_snapshot(self.tick, self.sim.player.lives, self.sim.game_over, {}, self.state, self.extras))
+        self.clients[player_id] = writer
+        self.sim.add_player(player_id)
+        try:
+            # Stop once broadcast() dropped this connection, its id may already be someone else's
+            while self.clients.get(player_id) is writer:
+                record_type = (await reader.readexactly(1))[0]
+                record = RECORDS.get(record_type)
+                if record is None or record_type not in (RECORD_MOVE, RECORD_CLICK):
+                    break
+                data = await reader.readexactly(record.size - 1)
+                self.intents.append((player_id, writer, record.unpack(bytes([record_type]) + data)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        self.drop(player_id, writer)
+
+    def drop(self, player_id, writer):
+        # Only if player_id still belongs to this connection: a dropped
+        # client's reader can outlive it while a new client reuses the id
+        if self.clients.get(player_id) is not writer:
+            return
+        del self.clients[player_id]
+        writer.close()
+        self.sim.remove_player(player_id)
+
+    def send(self, writer, payload):
+        writer.write(FRAME.pack(len(payload)) + payload)
+
+    def step(self, dt):
+        sim = self.sim
+        for player_id, writer, record in self.intents:
+            if self.clients.get(player_id) is not writer or sim.game_over:
+                continue  # Sent by a connection that has been dropped since
+            if record[0] == RECORD_MOVE:
+                sim.move_player(player_id, record[1])
+            else:
+                sim.player_click(player_id, (record[1], record[2]))
+        self.intents.clear()
+
+        if sim.game_over:
+            self.restart_timer += dt
+            if self.restart_timer >= ROUND_RESTART_MS:
+                self.restart_timer = 0
+                sim.reset(self.level)
+        else:
+            self.accumulator += dt
+            while self.accumulator >= SIM_TICK_MS:
+                sim.update(SIM_TICK_MS)
+                self.accumulator -= SIM_TICK_MS
+        self.broadcast()
+
+    def broadcast(self):
+        self.tick += 1
+        state = capture(self.sim, self.extras)
+        payload = encode_snapshot(self.tick, self.sim.player.lives, self.sim.game_over, self.state, state, self.extras)
+        for key in self.state:
+            if key not in state:
+                self.extras.pop(key, None)
+        self.state = state
+        self.snapshot_sizes.append(len(payload))
+        frame = FRAME.pack(len(payload)) + payload
+        for player_id, writer in list(self.clients.items()):
+            if writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+                self.drop(player_id, writer)  # Not keeping up, it would only fall further behind
+            else:
+                writer.write(frame)
+
+
+class RemoteProblem(MathProblem):
+    # A problem drawn from snapshots (the server has the real one)
+    __slots__ = ()
+
+    def __init__(self, shape, options, text):
+        self.option_rects = [pygame.Rect(0, 0, 50, 30) for _ in range(3)]
+        self.shape = shape
+        self.options = options
+        self.option_texts = [str(option) for option in options]
+        self.problem = text
+        self.radius = ASTEROID_RADIUS
+        self.correct_option_index = -1
+
+    def apply(self, fields, first=False):
+        x, y, rotation, flags, explosion = fields
+        if first:
+            self.prev_x = x / 4
+            self.prev_y = y / 4
+        self.x = x / 4
+        self.y = y / 4
+        self.rotation = rotation * 360 / 256
+        self.exploding = bool(flags & FLAG_EXPLODING)
+        self.wrong_answer_clicked = bool(flags & FLAG_WRONG)
+        if self.wrong_answer_clicked:
+            self.correct_option_index = flags >> 2 & 3
+        self.explosion_radius = explosion
+        self.update_option_rects()
+
+
+class RemoteBullet(Bullet):
+    __slots__ = ()
+
+    def __init__(self, angle):
+        self.angle = angle
+
+    def apply(self, fields, first=False):
+        if first:
+            self.prev_x = fields[0] / 4
+            self.prev_y = fields[1] / 4
+        self.x = fields[0] / 4
+        self.y = fields[1] / 4
+
+
+class ClientState:
+    # What a client draws: remote problems, bullets and ships, with the
+    # values of the previous snapshot kept in prev_x/prev_y for interpolation
+    def __init__(self):
+        self.fields = {}  # (kind, id) -> fields, as in the server state
+        self.problems = {}
+        self.bullets = {}
+        self.ships = {}  # player id -> (previous x, x)
+        self.scores = {}
+        self.lives = 0
+        self.game_over = False
+        self.received = 0.0  # time.perf_counter() of the last snapshot
+
+    def apply(self, data):
+        for thing in list(self.problems.values()) + list(self.bullets.values()):
+            thing.prev_x = thing.x
+            thing.prev_y = thing.y
+        for player_id, (_, x) in self.ships.items():
+            self.ships[player_id] = (x, x)
+
+        created = {}
+        tick, lives, game_over, removed, new, changed = decode_snapshot(data)
+        for key in removed:
+            del self.fields[key]
+            kind, entity_id = key
+            if kind == KIND_PROBLEM:
+                del self.problems[entity_id]
+            elif kind == KIND_BULLET:
+                del self.bullets[entity_id]
+            else:
+                del self.ships[entity_id]
+                del self.scores[entity_id]
+        for key, fields, extras in new:
+            self.fields[key] = fields
+            created[key] = True
+            kind, entity_id = key
+            if kind == KIND_PROBLEM:
+                self.problems[entity_id] = RemoteProblem(*extras)
+            elif kind == KIND_BULLET:
+                self.bullets[entity_id] = RemoteBullet(extras)
+        for key, values in changed:
+            fields = list(self.fields[key])
+            for i, value in values.items():
+                fields[i] = value
+            self.fields[key] = tuple(fields)
+
+        for key in created.keys() | {key for key, _ in changed}:
+            kind, entity_id = key
+            fields = self.fields[key]
+            if kind == KIND_PROBLEM:
+                self.problems[entity_id].apply(fields, key in created)
+            elif kind == KIND_BULLET:
+                self.bullets[entity_id].apply(fields, key in created)
+            else:
+                previous = self.ships.get(entity_id, (fields[0], fields[0]))[1]
+                self.ships[entity_id] = (fields[0] if key in created else previous, fields[0])
+                self.scores[entity_id] = fields[1]
+        self.lives = lives
+        self.game_over = game_over
+        self.received = time.perf_counter()
+
+
+class NetClient:
+    # Non-blocking connection, polled once per frame from the game loop
+    def __init__(self, host, port=DEFAULT_PORT):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.setblocking(False)
+        self.buffer = bytearray()
+        self.last_x = None
+
+    def move(self, x):
+        if x != self.last_x:
+            self.sock.sendall(RECORDS[RECORD_MOVE].pack(RECORD_MOVE, x))
+            self.last_x = x
+
+    def click(self, pos):
+        self.sock.sendall(RECORDS[RECORD_CLICK].pack(RECORD_CLICK, pos[0], pos[1]))
+
+    def poll(self):
+        # Complete messages received since the last call
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            if not data:
+                raise ConnectionError("Server closed the connection")
+            self.buffer += data
+        messages = []
+        offset = 0
+        while len(self.buffer) - offset >= FRAME.size:
+            (length,) = FRAME.unpack_from(self.buffer, offset)
+            if len(self.buffer) - offset - FRAME.size < length:
+                break
+            start = offset + FRAME.size
+            messages.append(bytes(self.buffer[start:start + length]))
+            offset = start + length
+        del self.buffer[:offset]
+        return messages
+
+
+def run_client(host, port):
+    import display
+    import text_cache
+    from assets import assets
+    from player import Player
+    from starfield import Starfield
+    from text_cache import render_text
+
+    display.init()
+    pygame.display.set_caption("Math Shooter (LAN)")
+    screen = display.screen
+    client = NetClient(host, port)
+    state = ClientState()
+    starfield = Starfield()
+    ship = Player()
+    clock = pygame.time.Clock()
+    player_id = None
+    tick_ms = 1000 / 30
+
+    while True:
+        clock.tick(60)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                pygame.quit()
+                return
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                client.click(event.pos)
+        client.move(pygame.mouse.get_pos()[0])
+
+        for message in client.poll():
+            if message[0] == MSG_WELCOME:
+                _, player_id, _, tick_hz = WELCOME.unpack(message)
+                tick_ms = 1000 / tick_hz
+            else:
+                before = dict(state.problems)
+                state.apply(message)
+                for problem_id, problem in before.items():
+                    if problem_id not in state.problems:
+                        text_cache.cache.evict(problem.texts())
+
+        # Draw the last two snapshots interpolated, like the local game does with ticks
+        alpha = min(1.0, (time.perf_counter() - state.received) * 1000 / tick_ms)
+        screen.fill(DARK_BLUE)
+        starfield.draw(screen, pygame.time.get_ticks())
+        for problem in state.problems.values():
+            problem.draw(screen, alpha)
+        for bullet in state.bullets.values():
+            bullet.draw(screen, alpha)
+        for ship_id, (previous, x) in state.ships.items():
+            ship.x = previous + (x - previous) * alpha
+            ship.draw(screen)
+            label = render_text(assets.font("small"), "You" if ship_id == player_id else f"P{ship_id}", WHITE)
+            screen.blit(label, (ship.x - label.get_width() // 2, ship.y + 18))
+
+        score = state.scores.get(player_id, 0)
+        screen.blit(render_text(assets.font("medium"), f"Score: {score}", WHITE), (20, 20))
+        lives_text = render_text(assets.font("medium"), f"Lives: {state.lives}", WHITE)
+        screen.blit(lives_text, (SCREEN_WIDTH - lives_text.get_width() - 20, 20))
+        y = 60
+        for ship_id, points in sorted(state.scores.items(), key=lambda item: -item[1])[:8]:
+            text = render_text(assets.font("small"), f"{'You' if ship_id == player_id else f'P{ship_id}'}: {points}", GREEN)
+            screen.blit(text, (SCREEN_WIDTH - text.get_width() - 20, y))
+            y += 25
+        if state.game_over:
+            text = render_text(assets.font("large"), "Round over, next round soon", WHITE)
+            screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 - 20))
+        pygame.display.flip()
+
+
+async def loopback_client(port, seconds, rng, mirror):
+    # Headless client: clicks options of asteroids it knows about now and
+    # then for the given time, and mirrors the server state from the
+    # snapshots until the server stops sending them
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    end = time.perf_counter() + seconds
+    next_click = 0
+    received = 0
+    try:
+        while True:
+            (length,) = FRAME.unpack(await asyncio.wait_for(reader.readexactly(FRAME.size), 1.0))
+            data = await reader.readexactly(length)
+            received += FRAME.size + length
+            if data[0] == MSG_SNAPSHOT:
+                apply_snapshot(mirror, data)
+            now = time.perf_counter()
+            if now >= end or now < next_click:
+                continue
+            problems = [fields for (kind, _), fields in mirror.items() if kind == KIND_PROBLEM]
+            if problems:
+                x, y = rng.choice(problems)[:2]
+                option = rng.randrange(3)
+                writer.write(RECORDS[RECORD_MOVE].pack(RECORD_MOVE, x // 4))
+                writer.write(RECORDS[RECORD_CLICK].pack(RECORD_CLICK, x // 4 - 50 + option * 60, y // 4 + 55))
+                next_click = now + rng.uniform(0.2, 1.0)
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+        pass
+    writer.close()
+    return received
+
+
+async def loadtest(clients, seconds, tick_hz, level):
+    server = GameServer(level, seed=1, tick_hz=tick_hz)
+    listener = await asyncio.start_server(server.handle_client, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    ticks = asyncio.ensure_future(server.run_ticks())
+    # Keep the wave busy so snapshots carry plenty of entities
+    server.sim.spawn_delay = 500
+
+    rng = random.Random(1)
+    mirrors = [{} for _ in range(clients)]
+    tasks = [asyncio.ensure_future(loopback_client(port, seconds, random.Random(rng.random()), mirror)) for mirror in mirrors]
+    await asyncio.sleep(seconds)
+    ticks.cancel()
+    received = await asyncio.gather(*tasks)
+    listener.close()
+    await listener.wait_closed()
+
+    matching = sum(mirror == server.state for mirror in mirrors)
+    step_times = server.step_times[10:] or server.step_times
+    print(f"{clients} clients, {server.tick} ticks at {tick_hz} Hz ({server.tick / seconds:.1f} Hz achieved)")
+    print(f"tick time p50 {statistics.median(step_times):.2f} ms, max {max(step_times):.2f} ms "
+          f"(budget {1000 / tick_hz:.1f} ms)")
+    print(f"snapshot size mean {statistics.mean(server.snapshot_sizes):.0f} bytes, max {max(server.snapshot_sizes)} bytes, "
+          f"{sum(received) / seconds / 1024:.0f} KB/s to all clients")
+    print(f"clients matching the server state: {matching}/{clients}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Math Shooter LAN multiplayer")
+    parser.add_argument("mode", choices=["server", "client", "loadtest"])
+    parser.add_argument("host", nargs="?", default="127.0.0.1", help="server address (client mode)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--level", type=int, default=LEVEL_BASIC, help="difficulty level (0-2)")
+    parser.add_argument("--tick-hz", type=int, default=30, help="server ticks (snapshots) per second")
+    parser.add_argument("--clients", type=int, default=40, help="loopback clients (loadtest mode)")
+    parser.add_argument("--seconds", type=float, default=10, help="duration (loadtest mode)")
+    args = parser.parse_args()
+
+    if args.mode == "server":
+        server = GameServer(args.level, tick_hz=args.tick_hz)
+        print(f"Serving on port {args.port}")
+        asyncio.run(server.serve(port=args.port))
+    elif args.mode == "client":
+        run_client(args.host, args.port)
+    else:
+        asyncio.run(loadtest(args.clients, args.seconds, args.tick_hz, args.level))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import pygame
+from itertools import repeat
+from constants import *
+from sprites import prepare
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, without it the game draws the old explosion circles
+    np = None
+
+PARTICLE_CAPACITY = 4096  # New particles are dropped while the pool is full
+FADE_STEPS = 8  # Pre-built brightness levels per particle kind
+DRAG = 0.997  # Velocity kept per millisecond
+
+# Particle kinds: (color, sprite radius)
+PARTICLE_DEBRIS = 0
+PARTICLE_EMBER = 1
+PARTICLE_SPARK = 2
+PARTICLE_TRAIL = 3
+PARTICLE_KINDS = [
+    (ORANGE, 4),
+    (YELLOW, 3),
+    (RED, 3),
+    (CYAN, 2),
+]
+
+
+def build_sprites():
+    # One glow sprite per kind and fade step, on black, for additive blits
+    # (black adds nothing, so the sprites need no alpha channel)
+    sprites = []
+    for color, radius in PARTICLE_KINDS:
+        for step in range(FADE_STEPS):
+            brightness = 1 - step / FADE_STEPS
+            surface = pygame.Surface((radius * 2 + 1, radius * 2 + 1))
+            for r in range(radius, 0, -1):
+                # Brighter towards the middle
+                level = brightness * (1 - (r - 1) / (radius + 1))
+                pygame.draw.circle(surface, [int(c * level) for c in color], (radius, radius), r)
+            sprites.append(prepare(surface, alpha=False))
+    return sprites
+
+
+class ParticleSystem:
+    # Pooled particles for explosion debris, wrong-answer sparks and bullet
+    # trails. Every particle is a row in preallocated NumPy arrays; step()
+    # moves, ages and compacts all of them at once and draw() does one
+    # blits() call. Particles are only eye candy: they use their own RNG
+    # and never touch the Simulation, so replays are unaffected.
+    def __init__(self, capacity=PARTICLE_CAPACITY, seed=None):
+        if np is None:
+            raise RuntimeError("Particles require NumPy (pip install numpy)")
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.age = np.zeros(capacity)
+        self.life = np.ones(capacity)
+        self.kind = np.zeros(capacity, dtype=np.intp)
+        self.rng = np.random.default_rng(seed)
+        self.sprites = None  # Built on first draw, once the display exists
+        self.offsets = np.array([radius for _, radius in PARTICLE_KINDS])
+
+    def emit(self, x, y, vx, vy, life, kind):
+        # Add len(vx) particles of one kind; x and y may be scalars
+        n = min(len(vx), self.capacity - self.count)
+        if n <= 0:
+            return
+        rows = slice(self.count, self.count + n)
+        self.x[rows] = x if np.ndim(x) == 0 else x[:n]
+        self.y[rows] = y if np.ndim(y) == 0 else y[:n]
+        self.vx[rows] = vx[:n]
+        self.vy[rows] = vy[:n]
+        self.age[rows] = 0
+        self.life[rows] = life[:n]
+        self.kind[rows] = kind
+        self.count += n
+
+    def burst(self, x, y, count, min_speed, max_speed, min_life, max_life, kind):
+        angles = self.rng.uniform(0, 2 * np.pi, count)
+        speeds = self.rng.uniform(min_speed, max_speed, count)
+        self.emit(x, y, np.cos(angles) * speeds, np.sin(angles) * speeds,
+                  self.rng.uniform(min_life, max_life, count), kind)
+
+    def explode(self, x, y):
+        # Debris of an asteroid shot with the right answer
+        self.burst(x, y, 40, 0.05, 0.25, 400, 800, PARTICLE_DEBRIS)
+        self.burst(x, y, 20, 0.02, 0.12, 300, 600, PARTICLE_EMBER)
+
+    def sparks(self, x, y):
+        # Short, fast sparks where a wrong answer hit
+        self.burst(x, y, 15, 0.15, 0.35, 150, 350, PARTICLE_SPARK)
+
+    def trails(self, x, y):
+        # One particle behind each bullet (x, y: lists of bullet positions)
+        n = len(x)
+        if n == 0:
+            return
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.emit(x + self.rng.uniform(-2, 2, n), y + self.rng.uniform(-2, 2, n),
+                  self.rng.uniform(-0.01, 0.01, n), self.rng.uniform(-0.01, 0.01, n),
+                  self.rng.uniform(80, 140, n), PARTICLE_TRAIL)
+
+    def step(self, dt):
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+        drag = DRAG ** dt
+        self.vx[:n] *= drag
+        self.vy[:n] *= drag
+        self.age[:n] += dt
+
+        # Compact: keep the live rows at the front
+        alive = self.age[:n] < self.life[:n]
+        live = int(alive.sum())
+        if live == n:
+            return
+        for column in (self.x, self.y, self.vx, self.vy, self.age, self.life, self.kind):
+            column[:live] = column[:n][alive]
+        self.count = live
+
+    def draw(self, surface, alpha=1.0):
+        # Additive blits of the pre-built sprites, extrapolated back from the
+        # last tick like interpolated objects. Returns the area drawn on.
+        n = self.count
+        if n == 0:
+            return None
+        if self.sprites is None:
+            self.sprites = build_sprites()
+        back = (alpha - 1) * SIM_TICK_MS
+        offsets = self.offsets[self.kind[:n]]
+        xs = (self.x[:n] + self.vx[:n] * back).astype(int) - offsets
+        ys = (self.y[:n] + self.vy[:n] * back).astype(int) - offsets
+        steps = np.minimum((self.age[:n] / self.life[:n] * FADE_STEPS).astype(int), FADE_STEPS - 1)
+        # (sprite, position, area, flags) tuples are built by zip(), not Python code
+        indices = (self.kind[:n] * FADE_STEPS + steps).tolist()
+        surface.blits(zip(map(self.sprites.__getitem__, indices), zip(xs.tolist(), ys.tolist()),
+                          repeat(None), repeat(pygame.BLEND_ADD)), doreturn=False)
+        size = int(self.offsets.max()) * 2 + 1
+        left, top = int(xs.min()), int(ys.min())
+        return pygame.Rect(left, top, int(xs.max()) - left + size, int(ys.max()) - top + size)
+
+    def clear(self):
+        self.count = 0
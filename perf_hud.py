@@ -0,0 +1,118 @@
+import cProfile
+import os
+import time
+from collections import deque
+import pygame
+from constants import *
+from assets import assets
+from frame_timer import PHASES
+import text_cache
+
+GRAPH_FRAMES = 120  # Frames shown in the frame-time graph
+GRAPH_HEIGHT = 60
+GRAPH_MAX_MS = 50  # Frame time at the top of the graph
+TARGET_FRAME_MS = 1000 / 60
+PANEL_WIDTH = 260
+LINE_HEIGHT = 22
+
+
+class PerfHud:
+    # Performance overlay toggled with F3: FPS, a graph of recent frame
+    # times, entity counts, font renders per frame (cached or not) and
+    # the smoothed per-phase times from the FrameTimer
+    def __init__(self, timer, visible=False):
+        self.timer = timer
+        self.visible = visible
+        self.frame_times = deque([0.0] * GRAPH_FRAMES, maxlen=GRAPH_FRAMES)
+        self.text_renders = 0
+        self.last_renders = text_cache.cache.renders
+        lines = 3 + len(PHASES)
+        self.panel = pygame.Surface((PANEL_WIDTH, lines * LINE_HEIGHT + GRAPH_HEIGHT + 15))
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def end_frame(self, frame_ms):
+        # frame_ms is the wall time since the previous frame
+        self.frame_times.append(frame_ms)
+        renders = text_cache.cache.renders
+        self.text_renders = max(0, renders - self.last_renders)  # The cache resets its count on clear()
+        self.last_renders = renders
+
+    def fps(self):
+        recent = list(self.frame_times)[-30:]
+        average = sum(recent) / len(recent)
+        return 1000 / average if average else 0
+
+    def draw(self, surface, sim):
+        # Returns the rects drawn. The panel is opaque so it can be drawn
+        # again over itself without a background restore.
+        if not self.visible:
+            return []
+        panel = self.panel
+        panel.fill(BLACK)
+        font = assets.font("small")
+        # Values change every frame, so these are rendered directly rather
+        # than through the text cache (and are not counted as text renders)
+        lines = [
+            f"FPS: {self.fps():.0f}",
+            f"Asteroids: {len(sim.math_problems)}  Bullets: {len(sim.bullets)}",
+            f"Text renders: {self.text_renders}",
+        ]
+        lines += [f"{phase}: {self.timer.averages[phase]:.2f} ms" for phase in PHASES]
+        y = 5
+        for line in lines:
+            panel.blit(font.render(line, True, GREEN), (8, y))
+            y += LINE_HEIGHT
+
+        # Frame-time graph, one column per frame, with a line at 60 FPS
+        bottom = y + GRAPH_HEIGHT + 5
+        scale = GRAPH_HEIGHT / GRAPH_MAX_MS
+        x = 8
+        for frame_ms in self.frame_times:
+            height = min(GRAPH_HEIGHT, int(frame_ms * scale))
+            if frame_ms <= TARGET_FRAME_MS + 1:
+                color = GREEN
+            elif frame_ms <= TARGET_FRAME_MS * 2:
+                color = YELLOW
+            else:
+                color = RED
+            pygame.draw.line(panel, color, (x, bottom), (x, bottom - height))
+            x += 2
+        target_y = bottom - int(TARGET_FRAME_MS * scale)
+        pygame.draw.line(panel, WHITE, (8, target_y), (8 + GRAPH_FRAMES * 2, target_y))
+
+        return [surface.blit(panel, (SCREEN_WIDTH - PANEL_WIDTH - 10, 60))]
+
+
+class FrameProfiler:
+    # Runs cProfile over the main loop for a fixed number of frames at a
+    # time and dumps each capture to a .prof file in directory. Open them
+    # with python -m pstats or a viewer such as snakeviz.
+    def __init__(self, frames, directory="profiles"):
+        self.frames = frames
+        self.directory = directory
+        self.profile = None
+        self.remaining = 0
+        self.captures = 0
+
+    def start(self):
+        if self.profile is not None:
+            return  # Already capturing
+        self.profile = cProfile.Profile()
+        self.remaining = self.frames
+        self.profile.enable()
+
+    def end_frame(self):
+        if self.profile is None:
+            return
+        self.remaining -= 1
+        if self.remaining > 0:
+            return
+        self.profile.disable()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"frames-{time.strftime('%Y%m%d-%H%M%S')}-{self.captures}.prof")
+        self.captures += 1
+        self.profile.dump_stats(path)
+        self.profile = None
+        print(f"Profiled {self.frames} frames to {path}", flush=True)
@@ -2,7 +2,6 @@ import pygame
 from constants import *
 
 class Player:
-    win_sfx = pygame.mixer.Sound("winners_W9Cpenj.mp3")
     def __init__(self):
         self.x = SCREEN_WIDTH // 2
         self.y = SCREEN_HEIGHT - 60
@@ -22,6 +21,10 @@ class Player:
             (self.x + 20, self.y + 15)
         ])
 
+    def bounds(self):
+        # Area draw() touches
+        return pygame.Rect(self.x - 21, self.y - 26, 42, 42)
+
     def update_level(self):
         # Calculate level based on score (level increases every 100 points)
         new_level = (self.score // 100) + 1
@@ -29,7 +32,6 @@ class Player:
         # Only update if level has increased
         if new_level > self.level:
             self.level = new_level
-            self.win_sfx.play()
             return True  # Return True if level increased
         return False  # Return False if level didn't change
         
@@ -0,0 +1,24 @@
+class Pool:
+    # Free list of reusable objects. Pooled classes rebuild their state in
+    # reset(), taking the same arguments as their constructor.
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            return obj
+        return self.factory(*args)
+
+    def release(self, obj):
+        self.free.append(obj)
+
+
+def swap_remove(items, index):
+    # Remove items[index] in O(1) by moving the last item into its place.
+    # Does not keep the order of the list.
+    last = items.pop()
+    if index < len(items):
+        items[index] = last
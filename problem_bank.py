@@ -0,0 +1,178 @@
+import os
+import pickle
+import random
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from constants import *
+
+# Operand ranges per difficulty level: operation -> (a_min, a_max, b_min, b_max).
+# For "-" b_max of None means b goes up to a (no negative answers). For "/"
+# the first range is the quotient, so every division comes out even.
+PROBLEM_RANGES = {
+    LEVEL_BASIC: {
+        "+": (1, 20, 1, 20),
+        "-": (5, 20, 1, None),
+    },
+    LEVEL_INTERMEDIATE: {
+        "+": (10, 50, 10, 50),
+        "-": (15, 50, 5, None),
+        "*": (2, 12, 2, 12),
+    },
+    LEVEL_ADVANCED: {
+        "+": (20, 99, 20, 99),
+        "-": (30, 99, 10, None),
+        "*": (5, 20, 5, 12),
+        "/": (1, 10, 2, 12),
+    },
+}
+
+SYMBOLS = {"+": "+", "-": "-", "*": "×", "/": "÷"}
+
+BANK_VERSION = 1  # Bump when the bank layout changes to invalidate old caches
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "problem_bank.cache")
+RECENT_PROBLEMS = 20  # Problems remembered to avoid showing repeats
+MAX_REPEAT_RETRIES = 8
+
+
+def enumerate_problems(operation, a_min, a_max, b_min, b_max):
+    # Every valid (answer, a, b) for one operation
+    problems = []
+    for a in range(a_min, a_max + 1):
+        for b in range(b_min, (a if b_max is None else b_max) + 1):
+            if operation == "+":
+                problems.append((a + b, a, b))
+            elif operation == "-":
+                problems.append((a - b, a, b))
+            elif operation == "*":
+                problems.append((a * b, a, b))
+            else:  # a is the quotient
+                problems.append((a, a * b, b))
+    return problems
+
+
+def distractor_candidates(answer):
+    # Every wrong answer generate_options could pick: within ±20% (at least
+    # ±5) of the answer, at least 1 and not the answer itself
+    max_offset = max(5, int(answer * 0.2))
+    candidates = set()
+    for offset in range(1, max_offset + 1):
+        candidates.add(answer + offset)
+        candidates.add(max(1, answer - offset))
+    candidates.discard(answer)
+    return array("h", sorted(candidates))
+
+
+class OperationTable:
+    # All problems for one operation at one level, sorted by answer, stored
+    # as compact parallel arrays
+    def __init__(self, problems):
+        problems.sort()
+        self.answers = array("h", (answer for answer, _, _ in problems))
+        self.a = array("h", (a for _, a, _ in problems))
+        self.b = array("h", (b for _, _, b in problems))
+
+    def answer_slice(self, min_answer=None, max_answer=None):
+        lo = 0 if min_answer is None else bisect_left(self.answers, min_answer)
+        hi = len(self.answers) if max_answer is None else bisect_right(self.answers, max_answer)
+        return lo, hi
+
+    def __len__(self):
+        return len(self.answers)
+
+
+class ProblemBank:
+    # Precomputed problems for every difficulty level, indexed by operation
+    # and answer, with precomputed wrong-answer candidates per answer.
+    # Sampling is O(1) (O(log n) when restricted to an answer range).
+    def __init__(self, tables, distractors):
+        self.tables = tables  # level -> operation -> OperationTable
+        self.distractors = distractors  # answer -> array of wrong answers
+        self.recent = deque(maxlen=RECENT_PROBLEMS)  # Used when the caller has no history of its own
+
+    @classmethod
+    def build(cls):
+        tables = {}
+        answers = set()
+        for level, operations in PROBLEM_RANGES.items():
+            tables[level] = {}
+            for operation, ranges in operations.items():
+                table = OperationTable(enumerate_problems(operation, *ranges))
+                tables[level][operation] = table
+                answers.update(table.answers)
+        distractors = {answer: distractor_candidates(answer) for answer in answers}
+        return cls(tables, distractors)
+
+    @classmethod
+    def load(cls, path=CACHE_PATH):
+        # Load the bank from the disk cache, building (and caching) it if
+        # the cache is missing or was made for other ranges
+        try:
+            with open(path, "rb") as f:
+                version, ranges, tables, distractors = pickle.load(f)
+            if version == BANK_VERSION and ranges == PROBLEM_RANGES:
+                return cls(tables, distractors)
+        except (OSError, pickle.PickleError, EOFError, ValueError, TypeError):
+            pass
+
+        bank = cls.build()
+        try:
+            with open(path, "wb") as f:
+                pickle.dump((BANK_VERSION, PROBLEM_RANGES, bank.tables, bank.distractors), f)
+        except OSError:
+            pass  # Read-only install, the bank is just rebuilt next time
+        return bank
+
+    def operations(self, level):
+        return list(self.tables[level])
+
+    def sample(self, level, operation=None, min_answer=None, max_answer=None, rng=random, recent=None):
+        # Returns (problem text, answer, operation), avoiding the problems
+        # in recent (see new_history()) when possible
+        if recent is None:
+            recent = self.recent
+        if operation is None:
+            operations = self.operations(level)
+        else:
+            operations = [operation]
+
+        attempts = 0
+        chosen = None  # Last drawn (operation, table, index)
+        while attempts < MAX_REPEAT_RETRIES:
+            candidate = rng.choice(operations)
+            table = self.tables[level][candidate]
+            lo, hi = table.answer_slice(min_answer, max_answer)
+            if lo == hi:
+                # No problem of this operation in the answer range, drop it
+                # (does not count as an attempt)
+                operations = [op for op in operations if op != candidate]
+                if not operations:
+                    raise ValueError(f"No problems with answers in [{min_answer}, {max_answer}] for level {level}")
+                continue
+            attempts += 1
+            chosen = (candidate, table, rng.randrange(lo, hi))
+            if (level, candidate, chosen[2]) not in recent:
+                break
+
+        operation, table, index = chosen
+        recent.append((level, operation, index))
+        text = f"{table.a[index]} {SYMBOLS[operation]} {table.b[index]}"
+        return text, table.answers[index], operation
+
+    def new_history(self):
+        # History of recently shown problems for one session
+        return deque(maxlen=RECENT_PROBLEMS)
+
+    def wrong_answers(self, answer, count=2, rng=random):
+        return rng.sample(self.distractors[answer], count)
+
+
+_bank = None
+
+
+def get_bank():
+    # Shared bank, loaded on first use
+    global _bank
+    if _bank is None:
+        _bank = ProblemBank.load()
+    return _bank
@@ -1,11 +1,23 @@
 import pygame
 import math
 from constants import *
+from sprites import bullet_sprites
 
 class Bullet:
+    # Bullets are pooled and reset in place (see Pool)
+    __slots__ = (
+        "x", "y", "prev_x", "prev_y", "width", "height", "speed",
+        "option_index", "direction_x", "direction_y", "angle",
+    )
+    
     def __init__(self, x, y, target_x, target_y, option_index):
+        self.reset(x, y, target_x, target_y, option_index)
+        
+    def reset(self, x, y, target_x, target_y, option_index):
         self.x = x
         self.y = y
+        self.prev_x = x  # Position before the last update, for interpolated drawing
+        self.prev_y = y
         self.width = 5
         self.height = 15
         self.speed = 0.5
@@ -22,22 +34,26 @@ class Bullet:
         self.angle = math.degrees(math.atan2(-self.direction_y, self.direction_x)) - 90
         
     def update(self, dt):
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.x += self.direction_x * self.speed * dt
         self.y += self.direction_y * self.speed * dt
         
-    def draw(self, surface):
-        # Draw bullet as a small elongated rectangle
-        bullet_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        pygame.draw.rect(bullet_surface, CYAN, (0, 0, self.width, self.height))
+    def draw(self, surface, alpha=1.0):
+        # Draw the pre-rotated sprite facing the direction of travel,
+        # interpolated between the last two simulation ticks
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        bullet_sprites.draw(surface, self.angle, x, y)
         
-        # Rotate bullet to face direction of travel
-        rotated_bullet = pygame.transform.rotate(bullet_surface, self.angle)
-        rect = rotated_bullet.get_rect(center=(self.x, self.y))
-        surface.blit(rotated_bullet, rect.topleft)
+    def bounds(self, alpha=1.0):
+        # Area draw() may touch (the rotated sprite fits in 20x20)
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        return pygame.Rect(int(x) - 10, int(y) - 10, 20, 20)
         
     def check_collision(self, problem):
-        # Simple circular collision detection with asteroid
+        # Simple circular collision detection with asteroid (squared distances, no sqrt)
         dx = self.x - problem.x
         dy = self.y - problem.y
-        distance = math.sqrt(dx * dx + dy * dy)
-        return distance < problem.radius 
\ No newline at end of file
+        return dx * dx + dy * dy < problem.radius * problem.radius 
\ No newline at end of file
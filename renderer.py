@@ -0,0 +1,45 @@
+import pygame
+from constants import *
+
+class DirtyRenderer:
+    # Dirty-rectangle rendering. Instead of filling and flipping the whole
+    # screen, every frame puts the cached background back over the areas
+    # drawn in the previous frame, the caller draws and add()s the rects it
+    # touches, and only the old and new rects are sent to the display.
+    # invalidate() forces one full redraw (e.g. when the game state changes).
+    def __init__(self, background):
+        self.background = background
+        self.previous = []  # Rects drawn in the last presented frame
+        self.current = []
+        self.full_redraw = True
+        self.began = False
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def begin(self, surface):
+        if self.full_redraw:
+            surface.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous:
+                surface.blit(self.background, rect, rect)
+        self.current = []
+        self.began = True
+
+    def add(self, rect):
+        self.current.append(rect)
+
+    def present(self, extra_rects=()):
+        # extra_rects are opaque areas drawn on top (e.g. debug overlays)
+        # that do not need restoring
+        if not self.began:
+            if extra_rects:
+                pygame.display.update(extra_rects)
+            return
+        self.began = False
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.previous + self.current + list(extra_rects))
+        self.previous = self.current
@@ -0,0 +1,183 @@
+# Deterministic session recording and replay.
+#
+# A session is fully determined by its seed, level, mode and the inputs fed
+# to the Simulation, so that is all a recording holds: a small header and a
+# stream of struct-packed records (simulation ticks, player moves, clicks).
+#
+# Replay recordings headless, as fast as possible:
+#     python replay.py recordings/session-*.msr
+#
+# Check that replays reproduce live sessions (plain, adaptive and, with
+# NumPy, swarm mode):
+#     python replay.py --check
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from constants import *
+from simulation import Simulation
+
+MAGIC = b"MSRP"
+VERSION = 1
+HEADER = struct.Struct("<4sBQBB")  # magic, version, seed, level, flags
+FLAG_SWARM = 1
+FLAG_ADAPTIVE = 2
+
+# Record type -> struct of the type byte plus its payload
+RECORD_TICK = 0
+RECORD_MOVE = 1
+RECORD_CLICK = 2
+RECORDS = {
+    RECORD_TICK: struct.Struct("<BH"),  # dt in milliseconds
+    RECORD_MOVE: struct.Struct("<Bh"),  # player x
+    RECORD_CLICK: struct.Struct("<Bhh"),  # mouse x, y
+}
+
+
+class Recorder:
+    # Writes one recording file per session into directory
+    def __init__(self, directory):
+        self.directory = directory
+        self.file = None
+        self.path = None
+        self.last_x = None
+
+    def start(self, seed, level, swarm=False, adaptive=False):
+        self.stop()
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"session-{time.strftime('%Y%m%d-%H%M%S')}-{seed:016x}.msr"
+        self.path = os.path.join(self.directory, name)
+        self.file = open(self.path, "wb")
+        flags = (FLAG_SWARM if swarm else 0) | (FLAG_ADAPTIVE if adaptive else 0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, level, flags))
+        self.last_x = None
+
+    def stop(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def tick(self, dt):
+        if self.file:
+            self.file.write(RECORDS[RECORD_TICK].pack(RECORD_TICK, dt))
+
+    def move(self, x):
+        # Only changes are recorded, the player usually stays put between frames
+        if self.file and x != self.last_x:
+            self.file.write(RECORDS[RECORD_MOVE].pack(RECORD_MOVE, x))
+            self.last_x = x
+
+    def click(self, pos):
+        if self.file:
+            self.file.write(RECORDS[RECORD_CLICK].pack(RECORD_CLICK, pos[0], pos[1]))
+
+
+def read_recording(path):
+    # Returns (seed, level, swarm, adaptive, records) where records is a
+    # list of (record type, values...) tuples
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, seed, level, flags = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} Math Shooter recording")
+
+    records = []
+    offset = HEADER.size
+    while offset < len(data):
+        record = RECORDS[data[offset]]
+        if offset + record.size > len(data):
+            # The game was killed mid-session, before the recorder was closed
+            print(f"{path}: dropped an incomplete record at the end ({len(data) - offset} bytes)")
+            break
+        records.append(record.unpack_from(data, offset))
+        offset += record.size
+    return seed, level, bool(flags & FLAG_SWARM), bool(flags & FLAG_ADAPTIVE), records
+
+
+def replay(path):
+    # Re-run a recorded session headless and return the finished Simulation
+    seed, level, swarm, adaptive, records = read_recording(path)
+    if swarm:
+        from swarm import SwarmSimulation
+        sim = SwarmSimulation(level, seed, adaptive)
+    else:
+        sim = Simulation(level, seed, adaptive)
+
+    for record in records:
+        if record[0] == RECORD_TICK:
+            sim.update(record[1])
+        elif record[0] == RECORD_MOVE:
+            sim.player.move_to(record[1])
+        else:
+            sim.handle_click((record[1], record[2]))
+    return sim
+
+
+def record_scripted(directory, seed, level, swarm=False, adaptive=False, ticks=6000):
+    # Play a seeded session with scripted moves and clicks while recording
+    # it, like Game does. Returns the live Simulation and the recording path.
+    if swarm:
+        from swarm import SwarmSimulation
+        sim = SwarmSimulation(level, seed, adaptive)
+    else:
+        sim = Simulation(level, seed, adaptive)
+    recorder = Recorder(directory)
+    recorder.start(seed, level, swarm, adaptive)
+    script = random.Random(seed)  # The player's choices, separate from the session RNG
+    for _ in range(ticks):
+        if sim.game_over:
+            break
+        x = script.randint(0, SCREEN_WIDTH)
+        sim.player.move_to(x)
+        recorder.move(x)
+        if sim.math_problems and script.random() < 0.05:
+            problem = script.choice(sim.math_problems)
+            option = problem.correct_option_index if script.random() < 0.8 else script.randrange(3)
+            pos = problem.option_rects[option].center
+            sim.handle_click(pos)
+            recorder.click(pos)
+        sim.update(SIM_TICK_MS)
+        recorder.tick(SIM_TICK_MS)
+    recorder.stop()
+    return sim, recorder.path
+
+
+def check(seed=1234):
+    # Replays must end exactly where the live sessions did
+    modes = [(LEVEL_ADVANCED, False, False), (LEVEL_INTERMEDIATE, False, True)]
+    try:
+        import numpy
+        modes.append((LEVEL_ADVANCED, True, False))
+    except ImportError:
+        pass
+    with tempfile.TemporaryDirectory() as directory:
+        for level, swarm, adaptive in modes:
+            live, path = record_scripted(directory, seed, level, swarm, adaptive)
+            replayed = replay(path)
+            expected = (live.player.score, live.player.level, live.player.lives, live.time, len(live.math_problems))
+            actual = (replayed.player.score, replayed.player.level, replayed.player.lives, replayed.time, len(replayed.math_problems))
+            mode = "swarm" if swarm else "adaptive" if adaptive else "plain"
+            assert actual == expected, f"{mode} replay diverged: {actual} != live {expected}"
+            assert live.player.score > 0, f"{mode} session never scored, the check would prove little"
+            print(f"{mode}: score {actual[0]}, lives {actual[2]}, {actual[3] / 1000:.1f} s replayed identically")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: python replay.py RECORDING... | --check")
+        sys.exit(2)
+    if sys.argv[1] == "--check":
+        check()
+        return
+    for path in sys.argv[1:]:
+        start = time.perf_counter()
+        sim = replay(path)
+        elapsed = time.perf_counter() - start
+        print(f"{path}: score {sim.player.score}, level {sim.player.level}, lives {sim.player.lives}, "
+              f"{sim.time / 1000:.1f} s simulated in {elapsed * 1000:.0f} ms ({sim.time / 1000 / max(elapsed, 1e-6):.0f}x real time)")
+
+
+if __name__ == "__main__":
+    main()
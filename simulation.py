@@ -0,0 +1,192 @@
+import random
+from constants import *
+from player import Player
+from math_problems import MathProblem
+from projectiles import Bullet
+from collision import SpatialHash
+from pool import Pool, swap_remove
+from problem_bank import get_bank
+from adaptive import AdaptiveDifficulty
+
+class Simulation:
+    # Pure game state stepped with update(dt). Nothing in here touches the
+    # display or the mixer, so sessions can be run headless (tests, bots,
+    # servers). Game wraps a Simulation and takes care of input, drawing
+    # and sounds.
+    def __init__(self, level=LEVEL_BASIC, seed=None, adaptive=False):
+        self.adaptive = adaptive  # Steer problems, speed and spawn rate with AdaptiveDifficulty
+        # Pools outlive reset() so a restarted session reuses the same objects
+        self.problem_pool = Pool(MathProblem)
+        self.bullet_pool = Pool(Bullet)
+        self.math_problems = []
+        self.bullets = []
+        self.reset(level, seed)
+
+    def reset(self, level=LEVEL_BASIC, seed=None):
+        # All randomness comes from the session RNG, so a session is fully
+        # determined by its seed and inputs (see replay.py)
+        self.seed = random.randrange(2 ** 64) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.recent_problems = get_bank().new_history()
+        self.player = Player()
+        for problem in self.math_problems:
+            self.problem_pool.release(problem)
+        for bullet in self.bullets:
+            self.bullet_pool.release(bullet)
+        self.math_problems = []
+        self.bullets = []
+        self.grid = SpatialHash()  # Broad-phase index of math problems
+        self.option_grid = SpatialHash()  # Index of their option rects, for clicks
+        self.spawn_timer = 0
+        self.difficulty_level = level  # Game difficulty level (separate from player level)
+        self.spawn_delay = SPAWN_DELAYS[level]
+        self.difficulty = AdaptiveDifficulty(level) if self.adaptive else None
+        self.time = 0  # Simulated time in milliseconds
+        self.game_over = False
+        self.events = []  # EVENT_* codes raised during the last update()
+        self.removed_problems = []  # Problems removed during the last update()
+        self.hits = []  # (x, y, correct) of every bullet hit during the last update()
+        self.answers = []  # (problem text, chosen option, correct, reaction ms, operation) for hits during the last update()
+
+    def add_problem(self, problem):
+        problem.spawn_time = self.time
+        self.math_problems.append(problem)
+        self.grid.insert(problem, problem.x, problem.y, problem.radius)
+        self.option_grid.insert(problem, *problem.option_area())
+
+    def handle_click(self, pos):
+        # Only problems whose options share the click's grid cell can be hit
+        for problem in self.option_grid.query(pos[0], pos[1]):
+            self.click_problem(problem, pos)
+
+    def click_problem(self, problem, pos):
+        option = self.clicked_option(problem, pos)
+        if option is not None:
+            self.fire(problem, option)
+
+    def clicked_option(self, problem, pos):
+        # Index of the problem's option under pos, or None
+        if problem.exploding or problem.selected or problem.y > SCREEN_HEIGHT:
+            return None  # Skip already answered, exploding, or off-screen problems
+
+        for i, rect in enumerate(problem.option_rects):
+            if rect.collidepoint(pos):
+                return i
+        return None
+
+    def fire(self, problem, option_index):
+        # Shoot a bullet from the player at the given problem
+        self.add_bullet(self.bullet_pool.acquire(self.player.x, self.player.y - 25, problem.x, problem.y, option_index))
+
+    def add_bullet(self, bullet):
+        self.bullets.append(bullet)
+
+    def lose_life(self):
+        self.player.lives -= 1
+        self.events.append(EVENT_LIFE_LOST)
+        if self.player.lives <= 0:
+            self.game_over = True
+
+    def update(self, dt):
+        if self.game_over:
+            return
+
+        self.events.clear()
+        self.removed_problems.clear()
+        self.hits.clear()
+        self.answers.clear()
+        self.time += dt
+
+        self.update_spawning(dt)
+        self.update_problems(dt)
+        self.update_bullets(dt)
+
+    def update_spawning(self, dt):
+        # Update player level based on score
+        if self.player.update_level():
+            self.events.append(EVENT_LEVEL_UP)
+            # Reduce spawn time slightly with each level
+            self.spawn_delay = max(2000, self.spawn_delay - 300)
+
+        # Spawn new math problems
+        self.spawn_timer += dt
+        spawn_delay = self.spawn_delay
+        if self.difficulty is not None:
+            spawn_delay *= self.difficulty.spawn_scale
+        if self.spawn_timer >= spawn_delay:
+            self.spawn_timer = 0
+            x = self.rng.randint(100, SCREEN_WIDTH - 100)
+            self.add_problem(self.problem_pool.acquire(x, -50, self.difficulty_level, self.rng, self.recent_problems, self.difficulty))
+
+    def update_problems(self, dt):
+        # Update math problems
+        problems = self.math_problems
+        i = 0
+        while i < len(problems):
+            problem = problems[i]
+            problem.update(dt)
+
+            # Remove problems that go off-screen or are answered correctly
+            if problem.y > SCREEN_HEIGHT or problem.selected:
+                swap_remove(problems, i)
+                self.grid.remove(problem)
+                self.option_grid.remove(problem)
+                self.removed_problems.append(problem)
+                self.problem_pool.release(problem)
+
+                # If problem goes off-screen without being answered, lose a life
+                if not problem.selected and problem.y > SCREEN_HEIGHT:
+                    if self.difficulty is not None:
+                        self.difficulty.record(problem.operation, False)
+                    self.lose_life()
+                continue
+
+            self.grid.move(problem, problem.x, problem.y, problem.radius)
+            self.option_grid.move(problem, *problem.option_area())
+            i += 1
+
+    def update_bullets(self, dt):
+        # Update bullets
+        bullets = self.bullets
+        i = 0
+        while i < len(bullets):
+            bullet = bullets[i]
+            bullet.update(dt)
+
+            # Remove bullets that go off-screen or hit a problem
+            if bullet.y < 0 or bullet.y > SCREEN_HEIGHT or bullet.x < 0 or bullet.x > SCREEN_WIDTH or self.check_hit(bullet):
+                swap_remove(bullets, i)
+                self.bullet_pool.release(bullet)
+                continue
+            i += 1
+
+    def check_hit(self, bullet):
+        # Check bullet collisions with problems sharing its grid cell
+        for problem in self.grid.query(bullet.x, bullet.y):
+            if problem.exploding or problem.selected:
+                continue
+
+            if bullet.check_collision(problem):
+                self.resolve_hit(bullet, problem)
+                return True
+        return False
+
+    def resolve_hit(self, bullet, problem):
+        correct = bullet.option_index == problem.correct_option_index
+        reaction = self.time - problem.spawn_time
+        self.hits.append((problem.x, problem.y, correct))
+        self.answers.append((problem.problem, problem.options[bullet.option_index], correct, reaction, problem.operation))
+        if self.difficulty is not None:
+            self.difficulty.record(problem.operation, correct, reaction)
+        
+        # Check if correct option
+        if correct:
+            problem.start_explosion()
+            self.events.append(EVENT_CORRECT)
+            # Award more points for harder levels
+            self.player.score += POINTS_PER_LEVEL[self.difficulty_level]
+        else:
+            problem.wrong_answer_clicked = True
+            problem.wrong_time = self.time
+            self.events.append(EVENT_WRONG)
+            self.lose_life()
@@ -0,0 +1,97 @@
+import math
+import random
+import pygame
+from constants import *
+
+COLORKEY = (255, 0, 255)  # Transparent color of sprites with hard edges
+
+
+def prepare(surface, alpha=True):
+    # Convert to the display pixel format when a window exists (faster blits)
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        return surface.convert_alpha() if alpha else surface.convert()
+    return surface
+
+
+class AsteroidAtlas:
+    # Pre-rendered asteroid sprites. A fixed set of outlines is generated
+    # once and each one is rasterized at ROTATION_STEPS quantized angles, so
+    # drawing an asteroid is a single blit. Rotations are built on first use.
+    # The outlines have hard edges, so sprites use a run-length encoded
+    # colorkey instead of per-pixel alpha, which blits several times faster.
+    def __init__(self, radius=ASTEROID_RADIUS, shapes=ASTEROID_SHAPES, steps=ROTATION_STEPS):
+        self.radius = radius
+        self.steps = steps
+        self.size = (radius + 10) * 2 + 2  # Room for the largest outline
+        self.shapes = [self.generate_shape(random.Random(i)) for i in range(shapes)]
+        self.sprites = {}
+
+    def generate_shape(self, rng):
+        # Generate irregular asteroid shape
+        points = []
+        for i in range(8):
+            angle = i * 45 + rng.uniform(-10, 10)
+            distance = self.radius + rng.uniform(-10, 10)
+            points.append((math.cos(math.radians(angle)) * distance, math.sin(math.radians(angle)) * distance))
+        return points
+
+    def get(self, shape, rotation):
+        step = int(round(rotation * self.steps / 360)) % self.steps
+        key = (shape, step)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.render(shape, step * 360 / self.steps)
+            self.sprites[key] = sprite
+        return sprite
+
+    def render(self, shape, angle):
+        surface = pygame.Surface((self.size, self.size))
+        surface.fill(COLORKEY)
+        center = self.size / 2
+        cos_a = math.cos(math.radians(angle))
+        sin_a = math.sin(math.radians(angle))
+        points = [(center + x * cos_a - y * sin_a, center + x * sin_a + y * cos_a) for x, y in self.shapes[shape]]
+        pygame.draw.polygon(surface, ASTEROID_COLOR, points)
+        surface = prepare(surface, alpha=False)
+        surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        return surface
+
+    def draw(self, surface, shape, rotation, x, y):
+        sprite = self.get(shape, rotation)
+        offset = self.size // 2
+        surface.blit(sprite, (x - offset, y - offset))
+
+
+class BulletSprites:
+    # Pre-rotated bullet sprites keyed by quantized angle. A bullet's angle
+    # never changes after it is fired, so drawing it is a lookup and a blit.
+    def __init__(self, width=5, height=15, color=CYAN, steps=BULLET_ROTATION_STEPS):
+        self.width = width
+        self.height = height
+        self.color = color
+        self.steps = steps
+        self.sprites = {}
+
+    def get(self, angle):
+        step = int(round(angle * self.steps / 360)) % self.steps
+        sprite = self.sprites.get(step)
+        if sprite is None:
+            sprite = self.render(step * 360 / self.steps)
+            self.sprites[step] = sprite
+        return sprite
+
+    def render(self, angle):
+        # Draw bullet as a small elongated rectangle rotated to face its direction
+        bullet_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        pygame.draw.rect(bullet_surface, self.color, (0, 0, self.width, self.height))
+        rotated = prepare(pygame.transform.rotate(bullet_surface, angle))
+        return rotated, rotated.get_width() // 2, rotated.get_height() // 2
+
+    def draw(self, surface, angle, x, y):
+        sprite, half_width, half_height = self.get(angle)
+        surface.blit(sprite, (x - half_width, y - half_height))
+
+
+# Shared caches used by every asteroid and bullet
+asteroid_atlas = AsteroidAtlas()
+bullet_sprites = BulletSprites()
@@ -0,0 +1,37 @@
+import random
+import pygame
+from constants import *
+from sprites import prepare
+
+class Starfield:
+    # Background stars pre-rendered into one surface per layer. Each layer
+    # is drawn twice, stacked vertically, so any scroll offset is a single
+    # blit of a screen-sized window out of it. The star count has no effect
+    # on the per-frame cost.
+    def __init__(self, count=STAR_COUNT, layers=STAR_LAYERS, speed=STAR_PARALLAX_SPEED, seed=0):
+        self.speed = speed
+        self.layers = []
+        rng = random.Random(seed)
+        for i in range(layers):
+            depth = (i + 1) / layers  # 1.0 for the nearest layer
+            surface = self.render_layer(rng, count // layers, i + 1, depth)
+            self.layers.append((surface, depth))
+
+    def render_layer(self, rng, count, size, depth):
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT * 2))
+        surface.set_colorkey(BLACK)
+        brightness = int(120 + 135 * depth)
+        color = (brightness, brightness, brightness)
+        for _ in range(count):
+            x = rng.randint(0, SCREEN_WIDTH)
+            y = rng.randint(0, SCREEN_HEIGHT)
+            pygame.draw.circle(surface, color, (x, y), size)
+            pygame.draw.circle(surface, color, (x, y + SCREEN_HEIGHT), size)
+        return prepare(surface, alpha=False)
+
+    def draw(self, surface, time):
+        # Scroll offset is derived from the time, so no per-frame state is kept
+        for layer, depth in self.layers:
+            offset = int(time * self.speed * depth) % SCREEN_HEIGHT
+            surface.blit(layer, (0, 0), (0, SCREEN_HEIGHT - offset, SCREEN_WIDTH, SCREEN_HEIGHT))
+
@@ -0,0 +1,258 @@
+# Persistent session and per-problem stats.
+#
+# While playing, sessions and answers are appended to a JSON lines log
+# (DIR/log.jsonl) by a background thread in batches, so the game never waits
+# on the disk. compact() moves the log into an indexed SQLite database
+# (DIR/stats.db) for leaderboard and per-problem queries. The writer
+# compacts on startup; it can also be run by hand, even while games are
+# running on the same directory:
+#     python stats.py leaderboard --level 2
+#     python stats.py problems
+import argparse
+import atexit
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+STATS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stats")
+LOG_NAME = "log.jsonl"
+COMPACTING_PATTERN = "log-*.compacting"  # Logs taken over by compact()
+DB_NAME = "stats.db"
+FLUSH_INTERVAL = 2.0  # Seconds between batched writes
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    started REAL,
+    seed TEXT,
+    level INTEGER,
+    swarm INTEGER,
+    score INTEGER,
+    player_level INTEGER,
+    lives INTEGER,
+    duration_ms INTEGER
+);
+CREATE TABLE IF NOT EXISTS answers (
+    session TEXT,
+    seq INTEGER,
+    problem TEXT,
+    chosen INTEGER,
+    correct INTEGER,
+    reaction_ms INTEGER,
+    PRIMARY KEY (session, seq)
+);
+CREATE TABLE IF NOT EXISTS difficulty (
+    session TEXT PRIMARY KEY,
+    state TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_score ON sessions (level, score DESC);
+CREATE INDEX IF NOT EXISTS answers_problem ON answers (problem);
+"""
+
+
+class StatsWriter:
+    # Collects records from the game thread (start_session, answer,
+    # end_session only append to a list) and appends them to the log from
+    # a background thread every FLUSH_INTERVAL seconds
+    def __init__(self, directory):
+        self.directory = directory
+        self.log_path = os.path.join(directory, LOG_NAME)
+        self.pending = []
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = False
+        self.session = None
+        self.sequence = 0
+        self.thread = threading.Thread(target=self.run, name="stats", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def write(self, record):
+        with self.lock:
+            self.pending.append(record)
+
+    def start_session(self, seed, level, swarm=False):
+        self.session = uuid.uuid4().hex
+        self.sequence = 0
+        self.write({"type": "session", "id": self.session, "started": time.time(),
+                    "seed": f"{seed:016x}", "level": level, "swarm": swarm})
+
+    def answer(self, problem, chosen, correct, reaction_ms):
+        if self.session is None:
+            return
+        self.write({"type": "answer", "session": self.session, "seq": self.sequence, "problem": problem,
+                    "chosen": chosen, "correct": correct, "reaction_ms": reaction_ms})
+        self.sequence += 1
+
+    def end_session(self, player, duration_ms, difficulty=None):
+        # difficulty is the final AdaptiveDifficulty.state() in adaptive mode
+        if self.session is None:
+            return
+        self.write({"type": "end", "session": self.session, "score": player.score, "player_level": player.level,
+                    "lives": max(0, player.lives), "duration_ms": duration_ms, "difficulty": difficulty})
+        self.session = None
+
+    def run(self):
+        try:
+            compact(self.directory)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Could not compact stats: {e}")
+        while True:
+            self.wake.wait(FLUSH_INTERVAL)
+            self.flush()
+            if self.stopping:
+                return
+
+    def flush(self):
+        with self.lock:
+            batch, self.pending = self.pending, []
+        if not batch:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.log_path, "a") as f:
+                f.write("".join(json.dumps(record) + "\n" for record in batch))
+        except OSError as e:
+            print(f"Could not save stats: {e}")
+
+    def close(self):
+        # Write what is left and stop the thread
+        if self.stopping:
+            return
+        self.stopping = True
+        self.wake.set()
+        self.thread.join(5)
+
+
+def connect(directory):
+    os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(os.path.join(directory, DB_NAME))
+    db.executescript(SCHEMA)
+    return db
+
+
+def read_log(path, offset):
+    # Records from offset on, and the offset after the last complete line
+    records = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # Torn write at the end of the log
+            offset += len(line)
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records, offset
+
+
+def compact(directory):
+    # Move the log into the database. The log is renamed to a file of its
+    # own first: other copies of the game sharing the directory then append
+    # to a new log instead of one that is emptied after it was read.
+    # Inserts are idempotent and renamed logs are only deleted once they are
+    # in the database, so a crash only repeats work next time.
+    log_path = os.path.join(directory, LOG_NAME)
+    if os.path.exists(log_path) and os.path.getsize(log_path) > 0:
+        try:
+            os.replace(log_path, os.path.join(directory, f"log-{uuid.uuid4().hex}.compacting"))
+        except FileNotFoundError:
+            pass  # Another copy of the game took it first
+    paths = glob.glob(os.path.join(directory, COMPACTING_PATTERN))
+    if not paths:
+        return 0
+
+    db = connect(directory)
+    count = 0
+    for path in paths:
+        offset = 0
+        while True:
+            # Read again until nothing is added: a writer that opened the log
+            # just before it was renamed still appends to this file
+            try:
+                records, end = read_log(path, offset)
+            except FileNotFoundError:
+                break  # Compacted by another copy of the game
+            if end == offset:
+                break
+            add_records(db, records)
+            count += len(records)
+            offset = end
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    db.close()
+    return count
+
+
+def add_records(db, records):
+    with db:
+        for record in records:
+            if record["type"] == "session":
+                db.execute("INSERT OR IGNORE INTO sessions (id, started, seed, level, swarm) VALUES (?, ?, ?, ?, ?)",
+                           (record["id"], record["started"], record["seed"], record["level"], record["swarm"]))
+            elif record["type"] == "answer":
+                db.execute("INSERT OR IGNORE INTO answers VALUES (?, ?, ?, ?, ?, ?)",
+                           (record["session"], record["seq"], record["problem"], record["chosen"],
+                            record["correct"], record["reaction_ms"]))
+            elif record["type"] == "end":
+                db.execute("UPDATE sessions SET score = ?, player_level = ?, lives = ?, duration_ms = ? WHERE id = ?",
+                           (record["score"], record["player_level"], record["lives"], record["duration_ms"],
+                            record["session"]))
+                if record.get("difficulty"):
+                    db.execute("INSERT OR IGNORE INTO difficulty VALUES (?, ?)",
+                               (record["session"], json.dumps(record["difficulty"])))
+
+
+def leaderboard(directory, level=None, limit=10):
+    # Best finished sessions as (score, player level, difficulty, started)
+    db = connect(directory)
+    query = "SELECT score, player_level, level, started FROM sessions WHERE score IS NOT NULL"
+    params = []
+    if level is not None:
+        query += " AND level = ?"
+        params.append(level)
+    query += " ORDER BY score DESC LIMIT ?"
+    params.append(limit)
+    rows = db.execute(query, params).fetchall()
+    db.close()
+    return rows
+
+
+def problem_stats(directory, limit=20):
+    # Hardest problems as (problem, times answered, accuracy, mean reaction ms)
+    db = connect(directory)
+    rows = db.execute("SELECT problem, COUNT(*), AVG(correct), AVG(reaction_ms) FROM answers "
+                      "GROUP BY problem ORDER BY AVG(correct), COUNT(*) DESC LIMIT ?", (limit,)).fetchall()
+    db.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Math Shooter stats")
+    parser.add_argument("command", choices=["compact", "leaderboard", "problems"])
+    parser.add_argument("--dir", default=STATS_DIR, help="stats directory (default: stats next to the game)")
+    parser.add_argument("--level", type=int, help="only sessions of this difficulty level (0-2)")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    compacted = compact(args.dir)
+    if args.command == "compact":
+        print(f"Compacted {compacted} records into {os.path.join(args.dir, DB_NAME)}")
+    elif args.command == "leaderboard":
+        for rank, (score, player_level, level, started) in enumerate(leaderboard(args.dir, args.level, args.limit), 1):
+            print(f"{rank:>3}. {score:>6}  player level {player_level}  difficulty {level}  "
+                  f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(started))}")
+    else:
+        for problem, count, accuracy, reaction in problem_stats(args.dir, args.limit):
+            print(f"{problem:>10}  answered {count:>4}x  {accuracy * 100:5.1f}% correct  {reaction / 1000:5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import random
+from functools import partial
+from constants import *
+from math_problems import MathProblem
+from projectiles import Bullet
+from simulation import Simulation
+from entity_store import EntityStore
+from pool import Pool
+
+
+def column(table, field):
+    # Attribute backed by the view's row in an EntityStore table
+    def get(self):
+        return getattr(getattr(self.store, table), field)[self.row]
+
+    def set(self, value):
+        getattr(getattr(self.store, table), field)[self.row] = value
+
+    return property(get, set)
+
+
+class ProblemView(MathProblem):
+    # MathProblem whose motion lives in the EntityStore. Everything else
+    # (problem text, options, explosion) is still a plain attribute.
+    __slots__ = ("store", "row", "rects", "parts")
+
+    x = column("problems", "x")
+    y = column("problems", "y")
+    prev_x = column("problems", "prev_x")
+    prev_y = column("problems", "prev_y")
+    speed = column("problems", "speed")
+    rotation = column("problems", "rotation")
+    rotation_speed = column("problems", "rotation_speed")
+    radius = column("problems", "radius")
+    serial = column("problems", "serial")  # Unique per spawn, pooled views are reused
+
+    def __init__(self, store, x, y, level, rng=random, recent=None, difficulty=None):
+        self.store = store
+        super().__init__(x, y, level, rng, recent, difficulty)
+
+    def reset(self, x, y, level, rng=random, recent=None, difficulty=None):
+        self.store.problems.add(self)
+        self.parts = None  # Rendered text and options, kept by SwarmDrawer (swarm_draw.py)
+        super().reset(x, y, level, rng, recent, difficulty)
+
+    @property
+    def option_rects(self):
+        # Rects are only moved when they are used (clicks and drawing)
+        self.place_option_rects(self.rects)
+        return self.rects
+
+    @option_rects.setter
+    def option_rects(self, rects):
+        self.rects = rects
+
+    def update_option_rects(self):
+        pass  # See option_rects
+
+    def update(self, dt):
+        # Motion is advanced for every row at once by EntityStore.step()
+        if self.exploding:
+            self.update_explosion(dt)
+
+    def start_explosion(self):
+        super().start_explosion()
+        self.store.problems.enabled[self.row] = False  # No more bullet hits
+
+
+class BulletView(Bullet):
+    # Bullet whose motion lives in the EntityStore
+    __slots__ = ("store", "row")
+
+    x = column("bullets", "x")
+    y = column("bullets", "y")
+    prev_x = column("bullets", "prev_x")
+    prev_y = column("bullets", "prev_y")
+    direction_x = column("bullets", "direction_x")
+    direction_y = column("bullets", "direction_y")
+    speed = column("bullets", "speed")
+    target = column("bullets", "target")  # Serial of the asteroid it was fired at
+
+    def __init__(self, store, x, y, target_x, target_y, option_index):
+        self.store = store
+        super().__init__(x, y, target_x, target_y, option_index)
+
+    def reset(self, x, y, target_x, target_y, option_index):
+        self.store.bullets.add(self)
+        self.target = -1  # Set by SwarmSimulation.fire()
+        super().reset(x, y, target_x, target_y, option_index)
+
+    def update(self, dt):
+        pass  # Advanced by EntityStore.step()
+
+
+class SwarmSimulation(Simulation):
+    # Simulation for swarm mode with 1000+ asteroids. Movement, off-screen
+    # checks and bullet collisions run on the EntityStore arrays; only
+    # exploding, removed or hit objects are touched one by one.
+    def __init__(self, level=LEVEL_ADVANCED, seed=None, adaptive=False):
+        self.adaptive = adaptive
+        self.store = EntityStore()
+        self.problem_pool = Pool(partial(ProblemView, self.store))
+        self.bullet_pool = Pool(partial(BulletView, self.store))
+        self.math_problems = []
+        self.bullets = []
+        self.reset(level, seed)
+
+    def reset(self, level=LEVEL_ADVANCED, seed=None):
+        super().reset(level, seed)
+        self.store.clear()
+        # The active lists are the store's row owners, so list index == row
+        self.math_problems = self.store.problems.owners
+        self.bullets = self.store.bullets.owners
+        self.spawn_delay = SWARM_SPAWN_DELAY
+        self.exploding_problems = []
+        self.next_serial = 0
+
+    def add_problem(self, problem):
+        problem.spawn_time = self.time  # Already stored by ProblemView.reset()
+        problem.serial = self.next_serial
+        self.next_serial += 1
+
+    def fire(self, problem, option_index):
+        super().fire(problem, option_index)
+        self.bullets[-1].target = problem.serial  # Only this asteroid can be hit
+
+    def add_bullet(self, bullet):
+        pass  # Already stored by BulletView.reset()
+
+    def handle_click(self, pos):
+        # Rows move every step, so instead of a click index the option boxes
+        # of all rows are tested against the click at once. Asteroids overlap
+        # a lot here, so one bullet is fired, at the asteroid drawn on top
+        # (the highest row) whose option was clicked.
+        rows = self.store.click_candidates(pos[0], pos[1])
+        for row in reversed(rows.tolist()):
+            problem = self.math_problems[row]
+            option = self.clicked_option(problem, pos)
+            if option is not None:
+                self.fire(problem, option)
+                return
+
+    def update_spawning(self, dt):
+        if self.player.update_level():
+            self.events.append(EVENT_LEVEL_UP)
+
+        # Spawn as many asteroids as fit in dt (the swarm rate does not change with level)
+        self.spawn_timer += dt
+        while self.spawn_timer >= self.spawn_delay:
+            self.spawn_timer -= self.spawn_delay
+            if len(self.math_problems) >= SWARM_MAX_ASTEROIDS:
+                continue
+            x = self.rng.randint(100, SCREEN_WIDTH - 100)
+            self.add_problem(self.problem_pool.acquire(x, -50, self.difficulty_level, self.rng, self.recent_problems, self.difficulty))
+
+    def update_problems(self, dt):
+        self.store.step(dt)
+
+        for problem in self.exploding_problems:
+            problem.update_explosion(dt)
+
+        # Remove problems that go off-screen or finished exploding
+        rows = set(self.store.offscreen_problems().tolist())
+        rows.update(problem.row for problem in self.exploding_problems if problem.selected)
+        if not rows:
+            return
+        removed = [self.math_problems[row] for row in rows]
+        self.store.problems.remove_rows(rows)
+        for problem in removed:
+            if problem.exploding:
+                self.exploding_problems.remove(problem)
+            self.removed_problems.append(problem)
+            self.problem_pool.release(problem)
+
+    def update_bullets(self, dt):
+        rows = set(self.store.offscreen_bullets().tolist())
+        bullet_rows, problem_rows = self.store.bullet_hits()
+        for bullet_row, problem_row in zip(bullet_rows.tolist(), problem_rows.tolist()):
+            problem = self.math_problems[problem_row]
+            if bullet_row in rows or problem.exploding:
+                continue  # Off-screen, or the asteroid was already hit this step
+            self.resolve_hit(self.bullets[bullet_row], problem)
+            rows.add(bullet_row)
+        if not rows:
+            return
+        removed = [self.bullets[row] for row in rows]
+        self.store.bullets.remove_rows(rows)
+        for bullet in removed:
+            self.bullet_pool.release(bullet)
+
+    def resolve_hit(self, bullet, problem):
+        super().resolve_hit(bullet, problem)
+        if problem.exploding:
+            self.exploding_problems.append(problem)
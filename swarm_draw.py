@@ -0,0 +1,89 @@
+import pygame
+from constants import *
+from assets import assets
+from sprites import asteroid_atlas, prepare, COLORKEY
+from text_cache import render_uncached
+
+class SwarmDrawer:
+    # Draws a SwarmSimulation with one blits() call. Positions come from the
+    # EntityStore arrays in one go. Every asteroid keeps its rendered problem
+    # text and its row of options on its view (1000+ different strings
+    # would thrash the shared TextCache); the rows are put together from
+    # plates with the number already on them, shared by every asteroid. Like
+    # the asteroid sprites, plates and labels use RLE colorkeys instead of
+    # per-pixel alpha: with 1000+ asteroids the blits are fill-rate bound.
+    def __init__(self):
+        self.plates = {}  # (option text, color) -> option plate
+        self.wrong_text = None
+
+    def plate(self, text, color):
+        key = (text, color)
+        plate = self.plates.get(key)
+        if plate is None:
+            plate = pygame.Surface((50, 30))
+            plate.fill(COLORKEY)
+            pygame.draw.rect(plate, color, plate.get_rect(), 0, 5)
+            label = render_uncached(assets.font("small"), text, BLACK)
+            plate.blit(label, ((50 - label.get_width()) // 2, (30 - label.get_height()) // 2))
+            plate = prepare(plate, alpha=False)
+            plate.set_colorkey(COLORKEY, pygame.RLEACCEL)
+            self.plates[key] = plate
+        return plate
+
+    def render_label(self, font, text):
+        # Antialiased against the asteroid color, which is then keyed out
+        # (edge pixels keep their blend, so text on the asteroid looks the same)
+        label = render_uncached(font, text, WHITE, True, ASTEROID_COLOR)
+        label = prepare(label, alpha=False)
+        label.set_colorkey(ASTEROID_COLOR, pygame.RLEACCEL)
+        return label
+
+    def build_parts(self, font, problem):
+        # (wrong answer clicked, [(image, dx, dy)]) drawn over and under an
+        # asteroid, rebuilt only when a wrong answer turns its options red
+        wrong = problem.wrong_answer_clicked
+        label = self.render_label(font, problem.problem)
+        row = pygame.Surface((170, 30))
+        row.fill(COLORKEY)
+        for i, text in enumerate(problem.option_texts):
+            color = RED if wrong and i != problem.correct_option_index else YELLOW
+            row.blit(self.plate(text, color), (i * 60, 0))
+        row = prepare(row, alpha=False)
+        row.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        parts = [(label, -(label.get_width() // 2), -(label.get_height() // 2)), (row, -75, 40)]
+        if wrong:
+            if self.wrong_text is None:
+                self.wrong_text = render_uncached(assets.font("medium"), "Wrong!", RED)
+            parts.append((self.wrong_text, -(self.wrong_text.get_width() // 2), -30))
+        return wrong, parts
+
+    def draw(self, surface, sim, alpha=1.0, skip_exploding=False):
+        # Same layering as drawing every MathProblem in row order.
+        # skip_exploding leaves explosions to the particle system.
+        table = sim.store.problems
+        n = table.count
+        if n == 0:
+            return
+        x = table.prev_x[:n] + (table.x[:n] - table.prev_x[:n]) * alpha
+        y = table.prev_y[:n] + (table.y[:n] - table.prev_y[:n]) * alpha
+        xs = x.astype(int).tolist()
+        ys = y.astype(int).tolist()
+        rotations = table.rotation[:n].tolist()
+        offset = asteroid_atlas.size // 2
+        font = assets.font("small")
+        blits = []
+        exploding = []
+        for problem, px, py, rotation in zip(sim.math_problems, xs, ys, rotations):
+            if problem.exploding:
+                if not skip_exploding:
+                    exploding.append(problem)
+                continue
+            blits.append((asteroid_atlas.get(problem.shape, rotation), (px - offset, py - offset)))
+            parts = problem.parts
+            if parts is None or parts[0] != problem.wrong_answer_clicked:
+                parts = problem.parts = self.build_parts(font, problem)
+            for image, dx, dy in parts[1]:
+                blits.append((image, (px + dx, py + dy)))
+        surface.blits(blits, doreturn=False)
+        for problem in exploding:
+            problem.draw(surface, alpha)
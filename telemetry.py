@@ -0,0 +1,244 @@
+# Live metrics from many copies of the game at once (e.g. a school lab).
+#
+# The game pushes small metric events into a TelemetrySender, a ring buffer
+# (deque with maxlen) that never blocks and drops the oldest events when
+# the sender falls behind. A background thread drains it every
+# SEND_INTERVAL seconds and sends zlib-compressed JSON batches as
+# datagrams, over UDP or a local Unix socket, to a collector that sums
+# them up over the last minute:
+#
+#     python main.py --telemetry udp://lab-server:5060
+#     python telemetry.py collect --listen udp://0.0.0.0:5060
+#
+#     python main.py --telemetry unix:/tmp/math-shooter.sock
+#     python telemetry.py collect --listen unix:/tmp/math-shooter.sock
+import argparse
+import atexit
+import collections
+import json
+import os
+import socket
+import statistics
+import threading
+import time
+import uuid
+import zlib
+from constants import *
+
+BUFFER_SIZE = 8192  # Events kept while the sender is behind
+SEND_INTERVAL = 1.0  # Seconds between batches
+MAX_BATCH = 2000  # Events per datagram, far below the 64 KB limit once compressed
+WINDOW = 60.0  # Seconds of history the collector reports on
+REPORT_INTERVAL = 5.0
+
+# Metric events, sent as lists: [kind, values...]
+METRIC_ANSWER = 0  # operation, correct (0/1), reaction ms
+METRIC_LIFE_LOST = 1
+METRIC_FRAME = 2  # ms since the previous frame
+
+
+def parse_address(address):
+    # "udp://host:port" or "unix:/path" -> (socket family, socket address)
+    if address.startswith("udp://"):
+        host, _, port = address[len("udp://"):].rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    if address.startswith("unix:"):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Unix sockets are not available on this system")
+        return socket.AF_UNIX, address[len("unix:"):]
+    raise ValueError(f"Unknown telemetry address: {address} (use udp://HOST:PORT or unix:PATH)")
+
+
+def encode_batch(client, sequence, dropped, events):
+    return zlib.compress(json.dumps({"client": client, "seq": sequence, "dropped": dropped, "events": events},
+                                    separators=(",", ":")).encode())
+
+
+def decode_batch(data):
+    return json.loads(zlib.decompress(data))
+
+
+class TelemetrySender:
+    # The push methods are called from the game loop and only append to
+    # the ring buffer; everything else happens on the sender thread
+    def __init__(self, address, buffer_size=BUFFER_SIZE):
+        family, self.target = parse_address(address)
+        self.socket = socket.socket(family, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.client = f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+        self.events = collections.deque(maxlen=buffer_size)
+        self.pushed = 0  # Events pushed, to work out how many the buffer dropped
+        self.taken = 0  # Events taken out of the buffer by the sender thread
+        self.sequence = 0
+        self.unsent = 0  # Events lost because a datagram could not be sent
+        self.last_frame = None
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, name="telemetry", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def push(self, event):
+        self.pushed += 1
+        self.events.append(event)
+
+    def record_update(self, sim):
+        # Answers and lost lives of the last simulation step
+        for _, _, correct, reaction, operation in sim.answers:
+            self.push([METRIC_ANSWER, operation, int(correct), reaction])
+        for event in sim.events:
+            if event == EVENT_LIFE_LOST:
+                self.push([METRIC_LIFE_LOST])
+
+    def record_frame(self):
+        # Called once per drawn frame; sends the time since the previous one
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.push([METRIC_FRAME, round((now - self.last_frame) * 1000, 1)])
+        self.last_frame = now
+
+    def run(self):
+        while True:
+            self.wake.wait(SEND_INTERVAL)
+            self.flush()
+            if self.stopping:
+                return
+
+    def flush(self):
+        events = []
+        try:
+            while True:
+                events.append(self.events.popleft())
+        except IndexError:
+            pass
+        self.taken += len(events)
+        # pushed is read after draining, so anything it counts that was
+        # neither taken nor is still waiting was pushed out of the full buffer
+        dropped = max(0, self.pushed - self.taken - len(self.events)) + self.unsent
+        for start in range(0, len(events), MAX_BATCH):
+            batch = events[start:start + MAX_BATCH]
+            try:
+                self.socket.sendto(encode_batch(self.client, self.sequence, dropped, batch), self.target)
+            except OSError:
+                self.unsent += len(batch)  # No collector, or its queue is full
+            self.sequence += 1
+
+    def close(self):
+        # Send what is left and stop the thread
+        if self.stopping:
+            return
+        self.stopping = True
+        self.wake.set()
+        self.thread.join(2)
+        self.socket.close()
+
+
+class Aggregator:
+    # Keeps the events of the last WINDOW seconds from every client
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.received = collections.deque()  # (arrival time, client, event)
+        self.clients = {}  # client -> (first seen, last seen, events dropped)
+        self.batches = 0
+
+    def add(self, payload, now):
+        client = payload["client"]
+        first_seen = self.clients.get(client, (now,))[0]
+        self.clients[client] = (first_seen, now, payload["dropped"])
+        self.batches += 1
+        for event in payload["events"]:
+            self.received.append((now, client, event))
+
+    def prune(self, now):
+        while self.received and self.received[0][0] < now - self.window:
+            self.received.popleft()
+        for client, (_, last_seen, _) in list(self.clients.items()):
+            if last_seen < now - self.window:
+                del self.clients[client]
+
+    def report(self, now):
+        self.prune(now)
+        answered = collections.Counter()
+        correct = collections.Counter()
+        lives_lost = 0
+        frames = collections.Counter()
+        frame_times = []
+        for _, client, event in self.received:
+            kind = event[0]
+            if kind == METRIC_ANSWER:
+                answered[event[1]] += 1
+                correct[event[1]] += event[2]
+            elif kind == METRIC_LIFE_LOST:
+                lives_lost += 1
+            elif kind == METRIC_FRAME:
+                frames[client] += 1
+                frame_times.append(event[1])
+
+        # Rates are per client minute, over the time each client was seen in the window
+        minutes = sum(min(self.window, max(1.0, now - first_seen)) for first_seen, _, _ in self.clients.values()) / 60
+        fps = [frames[client] / min(self.window, max(1.0, now - first_seen))
+               for client, (first_seen, _, _) in self.clients.items()]
+        lines = [f"{time.strftime('%H:%M:%S')}  {len(self.clients)} clients, {self.batches} batches"]
+        if minutes:
+            lines.append(f"  answered {sum(answered.values()) / minutes:.1f}/min, lives lost {lives_lost / minutes:.1f}/min per client")
+        if answered:
+            lines.append("  accuracy " + "  ".join(f"{operation} {correct[operation] / count * 100:.0f}% ({count})"
+                                                   for operation, count in sorted(answered.items())))
+        if fps:
+            lines.append(f"  FPS mean {statistics.fmean(fps):.1f}, min {min(fps):.1f}")
+        if len(frame_times) >= 2:
+            cuts = statistics.quantiles(frame_times, n=100)
+            lines.append(f"  frame ms p50 {cuts[49]:.1f}, p95 {cuts[94]:.1f}, p99 {cuts[98]:.1f}")
+        dropped = sum(dropped for _, _, dropped in self.clients.values())
+        if dropped:
+            lines.append(f"  {dropped} events dropped by senders")
+        return "\n".join(lines)
+
+
+def collect(address, seconds=None, report_interval=REPORT_INTERVAL):
+    # Receive batches and print a report every report_interval seconds
+    family, target = parse_address(address)
+    receiver = socket.socket(family, socket.SOCK_DGRAM)
+    if family == socket.AF_UNIX and os.path.exists(target):
+        os.remove(target)  # Left over from a collector that did not exit cleanly
+    receiver.bind(target)
+    receiver.settimeout(0.5)
+    aggregator = Aggregator()
+    start = time.monotonic()
+    next_report = start + report_interval
+    print(f"Collecting telemetry on {address}", flush=True)
+    try:
+        while seconds is None or time.monotonic() - start < seconds:
+            try:
+                data = receiver.recv(65536)
+                aggregator.add(decode_batch(data), time.monotonic())
+            except socket.timeout:
+                pass
+            except (ValueError, KeyError, TypeError, zlib.error):
+                pass  # Not one of our batches
+            now = time.monotonic()
+            if now >= next_report:
+                print(aggregator.report(now), flush=True)
+                next_report = now + report_interval
+    finally:
+        receiver.close()
+        if family == socket.AF_UNIX:
+            os.remove(target)
+    return aggregator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Math Shooter telemetry collector")
+    parser.add_argument("command", choices=["collect"])
+    parser.add_argument("--listen", default="udp://0.0.0.0:5060", help="udp://HOST:PORT or unix:PATH (default: udp://0.0.0.0:5060)")
+    parser.add_argument("--interval", type=float, default=REPORT_INTERVAL, help="seconds between reports")
+    parser.add_argument("--seconds", type=float, help="stop after this long")
+    args = parser.parse_args()
+    try:
+        collect(args.listen, args.seconds, args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from collections import OrderedDict
+
+class TextCache:
+    # Bounded LRU cache of rendered text surfaces. Most strings on screen
+    # (problem text, option numbers, HUD labels, menu labels) stay the same
+    # for many frames, so they only need to be rasterized once.
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0  # font.render() calls, including render_uncached()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        self.renders += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)  # Drop least recently used
+        return surface
+
+    def evict(self, texts):
+        # Remove every cached surface showing one of the given strings
+        texts = set(texts)
+        if not texts:
+            return
+        for key in [key for key in self.surfaces if key[1] in texts]:
+            del self.surfaces[key]
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+
+# Shared cache used by all draw code
+cache = TextCache()
+
+
+def render_text(font, text, color, antialias=True):
+    return cache.render(font, text, color, antialias)
+
+
+def render_uncached(font, text, color, antialias=True, background=None):
+    # For text kept by its owner instead (HUD panels, swarm asteroids),
+    # still counted so the performance HUD sees every font render
+    cache.renders += 1
+    return font.render(text, antialias, color, background)
@@ -1,5 +1,7 @@
 import pygame
 from constants import *
+from assets import assets
+from text_cache import render_text
 
 class Button:
     def __init__(self, x, y, width, height, text, color, hover_color):
@@ -16,7 +18,7 @@ class Button:
         # Border for button
         pygame.draw.rect(surface, WHITE, self.rect, 2, 10)
         
-        text_surf = font_medium.render(self.text, True, WHITE)
+        text_surf = render_text(assets.font("medium"), self.text, WHITE)
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
         
@@ -47,42 +49,50 @@ class Menu:
         self.advanced_button = Button(center_x - button_width // 2, advanced_y, button_width, button_height, "ADVANCED", RED, (255, 100, 100))
         self.start_button = Button(center_x - button_width // 2, start_y, button_width, button_height, "START GAME", GREEN, (100, 255, 100))
         
+        self.buttons = [self.basic_button, self.intermediate_button, self.advanced_button, self.start_button]
+        
         # Default selected level
         self.selected_level = LEVEL_BASIC
         self.basic_button.is_hovered = True
+        self.mouse_pos = None  # Position of the last hover check
+        self.dirty = True  # Set when the menu looks different from its last draw()
         
-    def handle_events(self, events, mouse_pos, mouse_click):
-        # Check button hovers
-        self.basic_button.check_hover(mouse_pos)
-        self.intermediate_button.check_hover(mouse_pos)
-        self.advanced_button.check_hover(mouse_pos)
-        self.start_button.check_hover(mouse_pos)
-        
-        # Check button clicks
-        if self.basic_button.is_clicked(mouse_pos, mouse_click):
-            self.selected_level = LEVEL_BASIC
-            return False
-            
-        if self.intermediate_button.is_clicked(mouse_pos, mouse_click):
-            self.selected_level = LEVEL_INTERMEDIATE
-            return False
-            
-        if self.advanced_button.is_clicked(mouse_pos, mouse_click):
-            self.selected_level = LEVEL_ADVANCED
-            return False
-            
-        if self.start_button.is_clicked(mouse_pos, mouse_click):
-            return True
+    def handle_events(self, batch):
+        # batch is the frame's InputBatch. Hovers only change when the mouse moves.
+        if batch.mouse_pos != self.mouse_pos:
+            self.mouse_pos = batch.mouse_pos
+            for button in self.buttons:
+                was_hovered = button.is_hovered
+                if button.check_hover(self.mouse_pos) != was_hovered:
+                    self.dirty = True
+        
+        # Check button clicks, in the order they were made
+        for pos in batch.clicks:
+            if self.basic_button.is_clicked(pos, True):
+                self.select_level(LEVEL_BASIC)
+            elif self.intermediate_button.is_clicked(pos, True):
+                self.select_level(LEVEL_INTERMEDIATE)
+            elif self.advanced_button.is_clicked(pos, True):
+                self.select_level(LEVEL_ADVANCED)
+            elif self.start_button.is_clicked(pos, True):
+                return True
             
         return False
         
+    def select_level(self, level):
+        if level != self.selected_level:
+            self.selected_level = level
+            self.dirty = True
+        
     def draw(self, surface):
+        self.dirty = False
+        
         # Draw title
-        title_text = font_large.render("MATH SHOOTER", True, WHITE)
+        title_text = render_text(assets.font("large"), "MATH SHOOTER", WHITE)
         surface.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 100))
         
         # Draw subtitle
-        subtitle_text = font_medium.render("Select Difficulty Level", True, WHITE)
+        subtitle_text = render_text(assets.font("medium"), "Select Difficulty Level", WHITE)
         surface.blit(subtitle_text, (SCREEN_WIDTH // 2 - subtitle_text.get_width() // 2, 160))
         
         # Draw level description
@@ -93,7 +103,7 @@ class Menu:
         else:  # LEVEL_ADVANCED
             level_text = "Advanced: +, -, ×, ÷ with larger numbers"
             
-        desc_text = font_small.render(level_text, True, YELLOW)
+        desc_text = render_text(assets.font("small"), level_text, YELLOW)
         surface.blit(desc_text, (SCREEN_WIDTH // 2 - desc_text.get_width() // 2, SCREEN_HEIGHT // 2 + 130))
         
         # Draw buttons